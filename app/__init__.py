@@ -4,12 +4,13 @@ from flask_cors import CORS
 from app.config import (
     JWT_SECRET_KEY,
     SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASS, FROM_EMAIL,
-    OTP_LENGTH, OTP_EXPIRE_MINUTES
+    OTP_LENGTH, OTP_EXPIRE_MINUTES, MAX_OTP_RESEND_PER_HOUR,
+    WARM_UP_ON_START, OTP_PURGE_ON_START
 )
 from app.extensions import jwt
 
 
-def create_app():
+def create_app(warm_up=None):
     app = Flask(__name__)
 
     # -------------------------------------------------
@@ -37,6 +38,13 @@ def create_app():
 
     app.config["OTP_LENGTH"] = OTP_LENGTH
     app.config["OTP_EXPIRE_MINUTES"] = OTP_EXPIRE_MINUTES
+    app.config["MAX_OTP_RESEND_PER_HOUR"] = MAX_OTP_RESEND_PER_HOUR
+
+    # -------------------------------------------------
+    # 🗄️ Database URL (fail at startup, not on the first query)
+    # -------------------------------------------------
+    from app.database import postgres
+    postgres.check_dsn()
 
     # -------------------------------------------------
     # 🔑 Initialize Extensions
@@ -58,4 +66,21 @@ def create_app():
     app.register_blueprint(chat_bp)
     app.register_blueprint(analytics_bp)             # ✅ NEW
 
+    # -------------------------------------------------
+    # 🧹 Periodic purge of expired / used OTP rows
+    # -------------------------------------------------
+    # (one process is enough: off unless OTP_PURGE_ON_START is set)
+    if OTP_PURGE_ON_START:
+        from app.services import otp_purge
+        otp_purge.start()
+
+    # -------------------------------------------------
+    # 🔥 Optional warm-up (models are otherwise loaded on first use)
+    # -------------------------------------------------
+    if warm_up is None:
+        warm_up = WARM_UP_ON_START
+    if warm_up:
+        from app.warmup import warm_up as run_warm_up
+        run_warm_up()
+
     return app
@@ -1,16 +1,2 @@
-def store_embeddings(embeddings, metadata):
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    for emb, meta in zip(embeddings, metadata):
-        cursor.execute(
-            """
-            INSERT INTO stock_embeddings (embedding, metadata)
-            VALUES (%s, %s)
-            """,
-            (emb, meta)   # emb = list[float], pgvector accepts this directly
-        )
-
-    conn.commit()
-    cursor.close()
-    conn.close()
+# Kept for older imports: the batched, pooled writer lives in app.embeddings.vector_db.
+from app.embeddings.vector_db import store_embeddings  # noqa: F401
@@ -1,4 +1,14 @@
+import threading
+from contextlib import contextmanager
+
 import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+
+from app.config import DATABASE_URL, PG_POOL_MIN, PG_POOL_MAX
+
+_pool = None
+_pool_lock = threading.Lock()
+
 
 def get_connection():
     return psycopg2.connect(
@@ -8,3 +18,46 @@ def get_connection():
         password="12345",
         port=5432
     )
+
+
+def check_dsn(dsn=None):
+    """
+    The pool speaks psycopg2, so DATABASE_URL must be a PostgreSQL URL.
+    Called from create_app() to fail at startup, not on the first checkout.
+    """
+    dsn = DATABASE_URL if dsn is None else dsn
+    scheme = dsn.split("://", 1)[0].lower() if "://" in dsn else ""
+    if scheme not in ("postgresql", "postgres"):
+        raise RuntimeError(
+            f"DATABASE_URL must be a postgresql:// URL for the connection pool, "
+            f"got {scheme + '://...' if scheme else 'no URL scheme'}"
+        )
+
+
+def get_pool():
+    """Process-wide pool, created on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                check_dsn()
+                _pool = ThreadedConnectionPool(PG_POOL_MIN, PG_POOL_MAX, dsn=DATABASE_URL)
+    return _pool
+
+
+@contextmanager
+def pooled_connection():
+    """
+    Borrow a pooled connection; rolled back on error and returned afterwards.
+    Broken connections are closed instead of going back to the pool.
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+    except Exception:
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn, close=bool(conn.closed))
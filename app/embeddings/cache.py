@@ -0,0 +1,184 @@
+"""
+Content-addressed, on-disk embedding cache.
+
+Rows are keyed by sha1(model name + row text). Vectors live in an
+append-only float32 file that is read through np.memmap, keys in a
+parallel file of 20-byte digests, one directory per model. Re-uploading
+a symbol file therefore only encodes the rows that are actually new.
+
+Several processes may append to the same directory (the server and
+`python -m app.embeddings.related_index`): appends happen under an
+fcntl lock on the directory, and every writer first picks up the rows
+the others appended, so positions always follow the files on disk.
+"""
+import fcntl
+import json
+import hashlib
+import os
+import re
+import threading
+from contextlib import contextmanager
+import numpy as np
+
+from app.config import EMBEDDING_CACHE_DIR
+
+DIGEST_SIZE = 20
+
+
+def digest(model_name, text):
+    return hashlib.sha1(f"{model_name}\0{text}".encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    def __init__(self, model_name, directory=EMBEDDING_CACHE_DIR):
+        self.model_name = model_name
+        self.directory = os.path.join(directory, re.sub(r"[^A-Za-z0-9_.-]", "_", model_name))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index = {}
+        self._rows = 0          # vectors on disk; new rows are appended at this position
+        self._dim = None
+        self._vectors = None
+        self._load()
+
+    # ---------------- FILES ----------------
+
+    @property
+    def _keys_path(self):
+        return os.path.join(self.directory, "keys.bin")
+
+    @property
+    def _vectors_path(self):
+        return os.path.join(self.directory, "vectors.f32")
+
+    @property
+    def _meta_path(self):
+        return os.path.join(self.directory, "meta.json")
+
+    @property
+    def _lock_path(self):
+        return os.path.join(self.directory, ".lock")
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock on the cache directory, shared with other processes."""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._lock_path, "a") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _load(self):
+        if not os.path.exists(self._meta_path):
+            return
+        with self._file_lock():
+            self._sync()
+
+    def _sync(self):
+        """
+        Index the rows other writers appended since the last look (under the
+        file lock). A crash between the two appends leaves one file longer:
+        both are cut back to the rows they share first.
+        """
+        if self._dim is None:
+            try:
+                with open(self._meta_path) as fh:
+                    self._dim = json.load(fh)["dim"]
+            except (FileNotFoundError, ValueError, KeyError):
+                return
+
+        key_bytes, vector_bytes = (
+            os.path.getsize(path) if os.path.exists(path) else 0
+            for path in (self._keys_path, self._vectors_path)
+        )
+        rows = min(key_bytes // DIGEST_SIZE, vector_bytes // (4 * self._dim))
+        if key_bytes != rows * DIGEST_SIZE:
+            with open(self._keys_path, "r+b") as fh:
+                fh.truncate(rows * DIGEST_SIZE)
+        if vector_bytes != rows * self._dim * 4:
+            with open(self._vectors_path, "r+b") as fh:
+                fh.truncate(rows * self._dim * 4)
+
+        if rows < self._rows:
+            # files were replaced underneath us: index them from scratch
+            self._index, self._rows, self._vectors = {}, 0, None
+        if rows == self._rows:
+            return
+
+        with open(self._keys_path, "rb") as fh:
+            fh.seek(self._rows * DIGEST_SIZE)
+            keys = fh.read((rows - self._rows) * DIGEST_SIZE)
+        for i in range(rows - self._rows):
+            self._index.setdefault(keys[i * DIGEST_SIZE:(i + 1) * DIGEST_SIZE], self._rows + i)
+        self._rows = rows
+
+    def _mapped(self):
+        if self._vectors is None or len(self._vectors) < self._rows:
+            self._vectors = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r", shape=(self._rows, self._dim)
+            )
+        return self._vectors
+
+    # ---------------- API ----------------
+
+    def get_many(self, keys):
+        """Cached vectors for `keys` (None for misses); updates hit/miss counters."""
+        with self._lock:
+            rows = [self._index.get(k) for k in keys]
+            found = [r for r in rows if r is not None]
+            self.hits += len(found)
+            self.misses += len(rows) - len(found)
+
+            if not found:
+                return [None] * len(keys)
+
+            vectors = self._mapped()
+            return [np.array(vectors[r]) if r is not None else None for r in rows]
+
+    def put_many(self, keys, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+
+        with self._lock, self._file_lock():
+            self._sync()
+
+            # first position of every new key: identical rows are stored once
+            first = {}
+            for i, k in enumerate(keys):
+                if k not in self._index:
+                    first.setdefault(k, i)
+            fresh = list(first.values())
+            if not fresh:
+                return
+
+            if self._dim is None:
+                self._dim = int(vectors.shape[1])
+                with open(self._meta_path, "w") as fh:
+                    json.dump({"model": self.model_name, "dim": self._dim}, fh)
+
+            # positions follow the vector file, whoever appended to it last
+            vector_bytes = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+            base = vector_bytes // (4 * self._dim)
+
+            # vectors first, then keys: a key never points past the vector file
+            with open(self._vectors_path, "ab") as fh:
+                vectors[fresh].tofile(fh)
+            with open(self._keys_path, "ab") as fh:
+                fh.write(b"".join(keys[i] for i in fresh))
+
+            for j, i in enumerate(fresh):
+                self._index[keys[i]] = base + j
+            self._rows = base + len(fresh)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "model": self.model_name,
+                "entries": len(self._index),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
@@ -1,14 +1,43 @@
 # app/embeddings/embedder.py
 
-from sentence_transformers import SentenceTransformer
+import threading
+import numpy as np
 
-# Load model once (important)
-model = SentenceTransformer("all-MiniLM-L6-v2")
+from app.config import EMBEDDING_MODEL, EMBEDDING_BATCH_SIZE
+from app.embeddings.cache import EmbeddingCache, digest
 
-def generate_embeddings(records):
+# 💤 Model + cache are loaded on first use (or by warm_up), not at import
+_model = None
+_cache = None
+_lock = threading.Lock()
+
+
+def get_model():
+    """The SentenceTransformer model, loaded once (important)."""
+    global _model
+    if _model is None:
+        with _lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
+                _model = SentenceTransformer(EMBEDDING_MODEL)
+    return _model
+
+
+def get_cache():
+    """Rows already encoded by this model are served from disk."""
+    global _cache
+    if _cache is None:
+        with _lock:
+            if _cache is None:
+                _cache = EmbeddingCache(EMBEDDING_MODEL)
+    return _cache
+
+
+def generate_embeddings(records, batch_size=EMBEDDING_BATCH_SIZE):
     """
     Generate local sentence embeddings using SentenceTransformers.
     No API, no quota, Infosys-safe.
+    Only rows missing from the embedding cache go through model.encode.
     """
     texts = []
 
@@ -16,7 +45,24 @@ def generate_embeddings(records):
         text = " ".join(str(v) for v in row.values())
         texts.append(text)
 
-    embeddings = model.encode(texts)
+    cache = get_cache()
+    keys = [digest(EMBEDDING_MODEL, text) for text in texts]
+    vectors = cache.get_many(keys)
+
+    misses = [i for i, v in enumerate(vectors) if v is None]
+    for start in range(0, len(misses), batch_size):
+        batch = misses[start:start + batch_size]
+        encoded = get_model().encode([texts[i] for i in batch], batch_size=batch_size)
+        cache.put_many([keys[i] for i in batch], encoded)
+        for i, vector in zip(batch, encoded):
+            vectors[i] = vector
+
+    if not vectors:
+        return []
 
     # Convert numpy array to list for DB storage
-    return embeddings.tolist()
+    return np.vstack(vectors).astype(np.float32).tolist()
+
+
+def cache_stats():
+    return get_cache().stats()
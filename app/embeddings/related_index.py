@@ -0,0 +1,164 @@
+"""
+In-process nearest-neighbour index for the related_stocks intent.
+
+One L2-normalized centroid embedding per symbol (the mean of its row
+embeddings), stored as a float32 matrix in a memory-mapped file with the
+symbol order in a JSON manifest. Queries are brute-force cosine scores
+(one matmul, batched for many queries) plus argpartition: exact, and a few
+milliseconds for thousands of symbols, so no graph index is needed.
+
+Uploads update one row in place (or append one), nothing is rebuilt.
+
+    python -m app.embeddings.related_index    # rebuild from the upload directory
+"""
+import json
+import os
+import threading
+import numpy as np
+
+from app.config import RELATED_INDEX_DIR, RELATED_DEFAULT_LIMIT
+
+_lock = threading.Lock()
+_index = {"loaded": False, "directory": None, "symbols": [], "rows": {}, "dim": None, "vectors": None}
+
+
+def _paths(directory):
+    return os.path.join(directory, "vectors.f32"), os.path.join(directory, "symbols.json")
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _load(directory):
+    """Map the persisted index (once per directory)."""
+    if _index["loaded"] and _index["directory"] == directory:
+        return
+
+    _index.update(loaded=True, directory=directory, symbols=[], rows={}, dim=None, vectors=None)
+    vectors_path, manifest_path = _paths(directory)
+    try:
+        with open(manifest_path) as fh:
+            manifest = json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return
+
+    symbols, dim = manifest["symbols"], manifest["dim"]
+    if symbols:
+        try:
+            vectors = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(len(symbols), dim))
+        except (OSError, ValueError):
+            # vectors.f32 missing or shorter than the manifest: start empty, uploads refill it
+            print(f"[RELATED INDEX] {vectors_path} missing or truncated; index treated as empty, "
+                  f"run `python -m app.embeddings.related_index` to rebuild")
+            return
+        _index["vectors"] = vectors
+    _index.update(symbols=symbols, rows={s: i for i, s in enumerate(symbols)}, dim=dim)
+
+
+def _save_manifest(directory):
+    _, manifest_path = _paths(directory)
+    tmp = manifest_path + ".tmp"
+    with open(tmp, "w") as fh:
+        json.dump({"dim": _index["dim"], "symbols": _index["symbols"]}, fh)
+    os.replace(tmp, manifest_path)
+
+
+def upsert(symbol, vector, directory=RELATED_INDEX_DIR):
+    """Set one symbol's centroid: overwrite its row in place, or append a row."""
+    vector = normalize(vector).reshape(-1)
+
+    with _lock:
+        _load(directory)
+        if _index["dim"] is not None and len(vector) != _index["dim"]:
+            raise ValueError(f"embedding dim {len(vector)} != index dim {_index['dim']}")
+
+        os.makedirs(directory, exist_ok=True)
+        vectors_path, _ = _paths(directory)
+        row = _index["rows"].get(symbol)
+
+        if row is not None:
+            mapped = np.memmap(vectors_path, dtype=np.float32, mode="r+", shape=(len(_index["symbols"]), _index["dim"]))
+            mapped[row] = vector
+            mapped.flush()
+            return
+
+        # truncate first: drops any tail a crashed append left behind
+        with open(vectors_path, "ab") as fh:
+            fh.truncate(len(_index["symbols"]) * len(vector) * 4)
+            vector.tofile(fh)
+
+        _index["dim"] = len(vector)
+        _index["rows"][symbol] = len(_index["symbols"])
+        _index["symbols"].append(symbol)
+        _index["vectors"] = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(len(_index["symbols"]), _index["dim"]))
+        _save_manifest(directory)
+
+
+def related_many(symbols, limit=RELATED_DEFAULT_LIMIT, directory=RELATED_INDEX_DIR):
+    """
+    Nearest symbols for several query symbols with one matmul.
+    Returns {symbol: [(other, score)]} best first; unknown symbols are omitted.
+    """
+    with _lock:
+        _load(directory)
+        vectors, rows, universe = _index["vectors"], _index["rows"], list(_index["symbols"])
+
+    known = [s for s in symbols if s in rows]
+    if not known or vectors is None:
+        return {}
+
+    query_rows = np.array([rows[s] for s in known])
+    scores = np.asarray(vectors[query_rows]) @ np.asarray(vectors).T
+    scores[np.arange(len(known)), query_rows] = -np.inf   # never return the query itself
+
+    k = min(limit, len(universe) - 1)
+    if k <= 0:
+        return {s: [] for s in known}
+
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    results = {}
+    for i, symbol in enumerate(known):
+        best = top[i][np.lexsort((top[i], -scores[i, top[i]]))]
+        results[symbol] = [(universe[j], round(float(scores[i, j]), 4)) for j in best]
+    return results
+
+
+def related(symbol, limit=RELATED_DEFAULT_LIMIT, directory=RELATED_INDEX_DIR):
+    """[(other_symbol, cosine score)] best first; None when `symbol` is not indexed."""
+    return related_many([symbol], limit, directory).get(symbol)
+
+
+def size(directory=RELATED_INDEX_DIR):
+    with _lock:
+        _load(directory)
+        return len(_index["symbols"])
+
+
+def rebuild(directory=RELATED_INDEX_DIR):
+    """
+    Index every uploaded symbol from its CSV, as the upload jobs see it
+    (row embeddings come from the embedding cache when warm).
+    """
+    import pandas as pd
+    from app.config import UPLOAD_DIR
+    from app.embeddings.embedder import generate_embeddings
+    from app.screener import store
+
+    count = 0
+    for filename in store.list_files():
+        symbol = store.symbol_from_filename(filename)
+        df = pd.read_csv(os.path.join(UPLOAD_DIR, filename))
+        if df.empty or symbol in store.INVALID_SYMBOLS:
+            continue
+        embeddings = generate_embeddings(df.to_dict(orient="records"))
+        upsert(symbol, np.mean(embeddings, axis=0), directory)
+        count += 1
+    print(f"[RELATED INDEX] {count} symbol(s) indexed")
+    return count
+
+
+if __name__ == "__main__":
+    rebuild()
@@ -1,21 +1,43 @@
 import json
-from app.database.postgres import get_connection
-
-def store_embeddings(embeddings, metadata):
-    print("Saving embeddings:", len(embeddings))
-
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    for emb, meta in zip(embeddings, metadata):
-        cursor.execute(
-            """
-            INSERT INTO stock_embeddings (embedding, metadata)
-            VALUES (%s, %s)
-            """,
-            (emb, json.dumps(meta))
-        )
-
-    conn.commit()
-    cursor.close()
-    conn.close()
\ No newline at end of file
+import threading
+import time
+
+from psycopg2.extras import execute_values
+
+from app.config import EMBEDDING_INSERT_BATCH
+from app.database.postgres import pooled_connection
+
+INSERT_SQL = "INSERT INTO stock_embeddings (embedding, metadata) VALUES %s"
+
+_stats = {"rows": 0, "statements": 0, "calls": 0, "last_rows_per_sec": None}
+_lock = threading.Lock()
+
+
+def store_embeddings(embeddings, metadata, batch_size=EMBEDDING_INSERT_BATCH):
+    """
+    Bulk-insert embeddings with multi-row VALUES statements of `batch_size`
+    rows over a pooled connection, committed once. Returns rows/second.
+    """
+    start = time.perf_counter()
+    rows = [(emb, json.dumps(meta, default=str)) for emb, meta in zip(embeddings, metadata)]
+
+    with pooled_connection() as conn:
+        with conn.cursor() as cursor:
+            for i in range(0, len(rows), batch_size):
+                execute_values(cursor, INSERT_SQL, rows[i:i + batch_size], page_size=batch_size)
+        conn.commit()
+
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    rate = len(rows) / elapsed
+    with _lock:
+        _stats["rows"] += len(rows)
+        _stats["statements"] += -(-len(rows) // batch_size)
+        _stats["calls"] += 1
+        _stats["last_rows_per_sec"] = round(rate, 1)
+    print(f"Saved embeddings: {len(rows)} in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+    return rate
+
+
+def stats():
+    with _lock:
+        return dict(_stats)
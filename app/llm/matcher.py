@@ -0,0 +1,203 @@
+"""
+Compiled single-pass matcher for the rule-based path of parse_query.
+
+The query is tokenized once with a precompiled regex, then scanned left
+to right. At every position the longest known phrase wins (a dict keyed
+by token tuples, built at import), so "high volume" is one high_volume
+hit rather than "high" + an unknown word. The same pass picks up the
+limit ("top 5", "bottom ten", "20 stocks"), simple numeric filters
+("close above 500"), periods ("last 4 quarters", "weekly") and leaves
+everything else as symbol keywords.
+"""
+import re
+
+TOKEN_RE = re.compile(r"[a-z]+|\d+(?:\.\d+)?|[<>]=?|==")
+
+# intent -> phrases. related_stocks wins over everything; "weak" words
+# only decide the intent when nothing stronger is present, so
+# "top 10 lowest" is low_price with limit 10.
+INTENT_PHRASES = {
+    "related_stocks": ["similar", "related", "peers", "peer", "comparable", "alternatives"],
+    "high_volume": ["most traded", "high volume", "top volume", "highest volume", "most active",
+                    "heavily traded", "actively traded", "liquid", "volume"],
+    "low_volume": ["low volume", "least traded", "lowest volume", "least active", "illiquid",
+                   "thinly traded"],
+    "high_turnover": ["high turnover", "highest turnover", "turnover", "money flow", "big money",
+                      "institutional flow"],
+    "high_delivery": ["high delivery", "delivery", "deliverable", "accumulation", "accumulated"],
+    "high_trades": ["most trades", "high trades", "number of trades"],
+    "high_price": ["high", "highest", "expensive", "costliest", "priciest", "premium"],
+    "low_price": ["low", "lowest", "lowet", "cheap", "cheapest", "cheaper", "penny", "affordable",
+                  "budget"],
+}
+
+WEAK_INTENTS = {
+    "top": "high_price",
+    "best": "high_price",
+    "leaders": "high_price",
+    "leading": "high_price",
+    "bottom": "low_price",
+    "worst": "low_price",
+    "laggards": "low_price",
+}
+
+LIMIT_WORDS = {"top", "first", "bottom", "best", "worst"}
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "fifteen": 15,
+    "twenty": 20, "thirty": 30, "fifty": 50, "hundred": 100,
+}
+
+COUNT_NOUNS = {"stocks", "stock", "shares", "companies", "names", "scrips", "picks"}
+
+# "last 4 quarters" keeps the screener's quarters contract; other units map to rollups
+PERIOD_UNITS = {
+    "quarter": "quarters", "quarters": "quarters",
+    "week": "weekly", "weeks": "weekly",
+    "month": "monthly", "months": "monthly",
+    "year": "yearly", "years": "yearly",
+}
+TIMEFRAME_WORDS = {"weekly": "weekly", "monthly": "monthly", "quarterly": "quarterly",
+                   "yearly": "yearly", "annual": "yearly", "annually": "yearly"}
+
+FILTER_FIELDS = {
+    "close": "close", "price": "close", "closing": "close", "open": "open", "vwap": "vwap",
+    "volume": "volume", "turnover": "turnover", "trades": "trades", "delivery": "%deliverble",
+}
+FILTER_OPERATORS = {
+    ("above",): ">", ("over",): ">", ("greater", "than"): ">", ("more", "than"): ">", (">",): ">",
+    ("below",): "<", ("under",): "<", ("less", "than"): "<", ("<",): "<",
+    (">=",): ">=", ("at", "least"): ">=", ("<=",): "<=", ("at", "most"): "<=",
+    ("==",): "==", ("equal", "to"): "==",
+}
+
+GENERIC_WORDS = {
+    "stock", "stocks", "market", "nse", "bse", "shares", "share", "equity", "equities",
+    "show", "me", "get", "find", "give", "list", "display", "tell", "fetch",
+    "to", "of", "like", "as", "with", "the", "a", "an", "and", "or", "for", "in", "on", "at",
+    "by", "from", "is", "are", "was", "what", "which", "who", "whats", "how", "please", "pls",
+    "i", "want", "need", "see", "some", "any", "all", "my", "today", "now", "current",
+    "currently", "right", "price", "prices", "companies", "company", "names", "scrips", "picks",
+    "data", "details", "info", "than", "period", "over", "last", "past",
+}
+
+SMALL_TALK = {
+    "hi", "hello", "hey", "hii", "hlo",
+    "good morning", "good evening", "good afternoon"
+}
+
+
+def _phrase_table():
+    table = {}
+    for intent, phrases in INTENT_PHRASES.items():
+        for phrase in phrases:
+            table.setdefault(tuple(phrase.split()), ("intent", intent))
+    for word, intent in WEAK_INTENTS.items():
+        table.setdefault((word,), ("weak", intent))
+    return table
+
+
+PHRASES = _phrase_table()
+# first word -> phrase lengths starting with it, longest first
+PHRASE_STARTS = {}
+for _phrase in PHRASES:
+    PHRASE_STARTS.setdefault(_phrase[0], set()).add(len(_phrase))
+PHRASE_STARTS = {word: sorted(sizes, reverse=True) for word, sizes in PHRASE_STARTS.items()}
+
+# words that open a multi-token construct (period, limit, filter)
+CONSTRUCT_WORDS = {"last", "past"} | LIMIT_WORDS | set(FILTER_FIELDS)
+
+
+def _number(token):
+    if token.isdigit():
+        return int(token)
+    if token[0].isdigit():
+        return float(token)
+    return NUMBER_WORDS.get(token)
+
+
+def _operator(tokens, i):
+    """(operator, tokens used) for a comparison starting at tokens[i]."""
+    for size in (2, 1):
+        op = FILTER_OPERATORS.get(tuple(tokens[i:i + size]))
+        if op:
+            return op, size
+    return None, 0
+
+
+def match(text):
+    """
+    One pass over a lower-cased query. Returns a dict with intent, limit,
+    keywords, filters and, when present, quarters / timeframe / periods.
+    """
+    tokens = TOKEN_RE.findall(text)
+    n = len(tokens)
+    strong, weak = [], []
+    result = {"intent": None, "keywords": [], "filters": [], "limit": None}
+
+    i = 0
+    while i < n:
+        tok = tokens[i]
+
+        if tok in CONSTRUCT_WORDS:
+            nxt = _number(tokens[i + 1]) if i + 1 < n else None
+
+            # "last 4 quarters", "past 6 months", "last quarter"
+            if tok in ("last", "past"):
+                count, unit_at = (nxt, i + 2) if isinstance(nxt, int) else (1, i + 1)
+                unit = PERIOD_UNITS.get(tokens[unit_at]) if unit_at < n else None
+                if unit:
+                    if unit == "quarters":
+                        result["quarters"] = count
+                    else:
+                        result["timeframe"], result["periods"] = unit, count
+                    i = unit_at + 1
+                    continue
+
+            # "top 5", "bottom ten"
+            if tok in LIMIT_WORDS and isinstance(nxt, int):
+                result["limit"] = nxt
+                if tok in WEAK_INTENTS:
+                    weak.append(WEAK_INTENTS[tok])
+                i += 2
+                continue
+
+            # "close above 500", "volume > 100000"
+            if tok in FILTER_FIELDS and i + 1 < n:
+                op, size = _operator(tokens, i + 1)
+                value = _number(tokens[i + 1 + size]) if op and i + 1 + size < n else None
+                if value is not None:
+                    result["filters"].append({"field": FILTER_FIELDS[tok], "operator": op, "value": value})
+                    i += 2 + size
+                    continue
+
+        # longest known phrase at this position
+        sizes = PHRASE_STARTS.get(tok)
+        if sizes:
+            hit = None
+            for size in sizes:
+                hit = PHRASES.get(tuple(tokens[i:i + size])) if size > 1 else PHRASES.get((tok,))
+                if hit:
+                    break
+            if hit:
+                (strong if hit[0] == "intent" else weak).append(hit[1])
+                i += size
+                continue
+
+        number = _number(tok)
+        if number is not None:
+            # "20 stocks"
+            if isinstance(number, int) and i + 1 < n and tokens[i + 1] in COUNT_NOUNS:
+                result["limit"] = number
+        elif tok in TIMEFRAME_WORDS:
+            result["timeframe"] = TIMEFRAME_WORDS[tok]
+        elif tok.isalpha() and tok not in GENERIC_WORDS:
+            result["keywords"].append(tok)
+        i += 1
+
+    if "related_stocks" in strong:
+        result["intent"] = "related_stocks"
+    elif strong or weak:
+        result["intent"] = (strong or weak)[0]
+    return result
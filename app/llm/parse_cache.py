@@ -0,0 +1,151 @@
+"""
+LRU + TTL cache for LLM-parsed queries, with single-flight misses.
+
+Keys are normalized queries (lower-cased, whitespace collapsed), so
+"Top 5 stocks" and "top 5 stocks " share one entry. Concurrent misses on
+the same key wait for the one in-flight LLM call instead of making their
+own. Set PARSE_CACHE_PATH to keep entries across restarts.
+"""
+import copy
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from app.config import PARSE_CACHE_SIZE, PARSE_CACHE_TTL_SECONDS, PARSE_CACHE_PATH
+
+# key -> {"value", "expires_at", "latency"}; most recently used last.
+# seconds_saved adds up the recorded LLM latency of every cache hit.
+_entries = OrderedDict()
+_inflight = {}
+_stats = {"hits": 0, "misses": 0, "coalesced": 0, "expired": 0, "evictions": 0,
+          "llm_calls": 0, "llm_errors": 0, "llm_seconds": 0.0, "seconds_saved": 0.0}
+_state = {"loaded": False}
+_lock = threading.Lock()
+
+
+def normalize(query):
+    return " ".join(query.lower().split())
+
+
+def _load():
+    _state["loaded"] = True
+    if not PARSE_CACHE_PATH:
+        return
+    try:
+        with open(PARSE_CACHE_PATH) as fh:
+            saved = json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return
+
+    now = time.time()
+    for key, entry in saved.items():
+        if entry["expires_at"] > now:
+            _entries[key] = entry
+    while len(_entries) > PARSE_CACHE_SIZE:
+        _entries.popitem(last=False)
+
+
+def _save():
+    if not PARSE_CACHE_PATH:
+        return
+    with _lock:
+        snapshot = json.dumps(_entries)
+
+    directory = os.path.dirname(PARSE_CACHE_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{PARSE_CACHE_PATH}.{threading.get_ident()}.tmp"
+    with open(tmp, "w") as fh:
+        fh.write(snapshot)
+    os.replace(tmp, PARSE_CACHE_PATH)
+
+
+def _lookup(key):
+    """Cached value or None (caller holds the lock)."""
+    entry = _entries.get(key)
+    if entry is None:
+        return None
+    if entry["expires_at"] <= time.time():
+        del _entries[key]
+        _stats["expired"] += 1
+        return None
+
+    _entries.move_to_end(key)
+    _stats["hits"] += 1
+    _stats["seconds_saved"] += entry["latency"]
+    return entry["value"]
+
+
+def get_or_call(query, call):
+    """
+    Parsed result for `query`: from the cache, from an identical in-flight
+    call, or from `call(query)`. Keyed on the normalized query, but the
+    call gets the text as the user wrote it (casing can matter to the
+    model). Errors are raised to every waiter and never cached.
+    """
+    key = normalize(query)
+
+    with _lock:
+        if not _state["loaded"]:
+            _load()
+
+        value = _lookup(key)
+        if value is not None:
+            return copy.deepcopy(value)
+
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+            _stats["misses"] += 1
+        else:
+            _stats["coalesced"] += 1
+
+    if not leader:
+        return copy.deepcopy(future.result())
+
+    start = time.perf_counter()
+    try:
+        value = call(query)
+    except Exception as e:
+        with _lock:
+            _stats["llm_errors"] += 1
+            del _inflight[key]
+        future.set_exception(e)
+        raise
+    latency = time.perf_counter() - start
+
+    with _lock:
+        _stats["llm_calls"] += 1
+        _stats["llm_seconds"] += latency
+        _entries[key] = {"value": value, "expires_at": time.time() + PARSE_CACHE_TTL_SECONDS, "latency": latency}
+        _entries.move_to_end(key)
+        while len(_entries) > PARSE_CACHE_SIZE:
+            _entries.popitem(last=False)
+            _stats["evictions"] += 1
+        del _inflight[key]
+
+    future.set_result(value)
+    _save()
+    return copy.deepcopy(value)
+
+
+def stats():
+    with _lock:
+        result = dict(_stats, entries=len(_entries), inflight=len(_inflight))
+
+    lookups = result["hits"] + result["misses"] + result["coalesced"]
+    result["hit_rate"] = round(result["hits"] / lookups, 4) if lookups else None
+    result["avg_llm_seconds"] = round(result["llm_seconds"] / result["llm_calls"], 4) if result["llm_calls"] else None
+    result["llm_seconds"] = round(result["llm_seconds"], 3)
+    result["seconds_saved"] = round(result["seconds_saved"], 3)
+    return result
+
+
+def clear():
+    with _lock:
+        _entries.clear()
+    _save()
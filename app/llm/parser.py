@@ -1,50 +1,39 @@
 import os
 import json
-import re
-from google import genai
-from google.genai import types
+import threading
 from app.llm.prompt import PROMPT_TEMPLATE
+from app.llm.matcher import match, TOKEN_RE, INTENT_PHRASES, GENERIC_WORDS, SMALL_TALK
+from app.llm import parse_cache
 
-client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
+# 💤 Gemini client is created on first LLM fallback (or by warm_up), not at import
+_client = None
+_client_lock = threading.Lock()
 
-INTENT_SYNONYMS = {
-    "high_price": ["high", "highest", "top", "expensive", "costliest"],
-    "low_price": ["low", "lowest", "cheap", "cheapest", "lowet"],
-    "high_volume": ["most traded", "high volume", "top volume"],
-    "low_volume": ["low volume", "least traded"],
-}
+# Vocabulary (intents, stopwords, small talk) lives in the compiled matcher
+INTENT_SYNONYMS = INTENT_PHRASES
 
-GENERIC_WORDS = {
-    "stock", "stocks", "market", "nse", "shares",
-    "show", "me", "get", "find", "give", "list"
-}
+# ---------------- HELPERS ----------------
 
-SMALL_TALK = {
-    "hi", "hello", "hey", "hii", "hlo",
-    "good morning", "good evening", "good afternoon"
-}
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from google import genai
+                _client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
+    return _client
 
-# ---------------- HELPERS ----------------
 
 def extract_limit(text: str):
-    match = re.search(r'(top|first)\s*(\d+)', text)
-    return int(match.group(2)) if match else None
+    return match(text.lower())["limit"]
 
 
 def detect_intent(text: str):
-    for intent, words in INTENT_SYNONYMS.items():
-        if any(w in text for w in words):
-            return intent
-    return None
+    return match(text.lower())["intent"]
 
 
 def extract_keywords(text: str):
-    words = re.findall(r"[a-zA-Z]+", text.lower())
-    return [
-        w for w in words
-        if w not in GENERIC_WORDS
-        and w not in sum(INTENT_SYNONYMS.values(), [])
-    ]
+    return match(text.lower())["keywords"]
 
 # ---------------- MAIN ----------------
 
@@ -55,26 +44,24 @@ def parse_query(query: str) -> dict:
     if q in SMALL_TALK:
         return {"ignore": True}
 
-    # 2️⃣ ALWAYS extract limit first
-    limit = extract_limit(q)
+    # 2️⃣ Intent, limit, keywords, filters and periods in one compiled pass
+    # 3️⃣ Rule-based response (no LLM) whenever the query has words the matcher
+    # can read; "show me all stocks" is simply the whole universe
+    if TOKEN_RE.search(q):
+        return match(q)
+
+    # 4️⃣ LLM fallback for everything else, e.g. non-Latin scripts
+    # (cached per normalized query, one call per concurrent miss; the model
+    # sees the original text, not the lower-cased key)
+    return parse_cache.get_or_call(query, llm_parse)
 
-    # 3️⃣ Detect intent & keywords
-    intent = detect_intent(q)
-    keywords = extract_keywords(q)
 
-    # 4️⃣ Rule-based response (no LLM)
-    if intent or keywords:
-        return {
-            "intent": intent,
-            "keywords": keywords,
-            "filters": [],
-            "limit": limit
-        }
+def llm_parse(query: str, limit=None) -> dict:
+    from google.genai import types
 
-    # 5️⃣ LLM fallback
     prompt = PROMPT_TEMPLATE.replace("{query}", query)
 
-    response = client.models.generate_content(
+    response = get_client().models.generate_content(
         model="gemini-2.5-flash-lite",
         contents=prompt,
         config=types.GenerateContentConfig(
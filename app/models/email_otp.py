@@ -1,10 +1,19 @@
 # app/models/email_otp.py
-from sqlalchemy import Column, Integer, String, TIMESTAMP, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, TIMESTAMP, Boolean, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.db import Base
 
 class EmailOTP(Base):
     __tablename__ = "email_otps"
+    __table_args__ = (
+        # verify_otp: latest unused OTP of a user / purpose
+        Index("ix_email_otps_user_purpose_used_created", "user_id", "purpose", "is_used", "created_at"),
+        # resend_otp: OTPs issued to a user / purpose inside the rate-limit window
+        Index("ix_email_otps_user_purpose_created", "user_id", "purpose", "created_at"),
+        # otp_purge: range delete of long-expired rows
+        Index("ix_email_otps_expires_at", "expires_at"),
+    )
+
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("email_users.id", ondelete="CASCADE"), nullable=False)
     otp = Column(String(16), nullable=False)          # store plain or hashed OTP (we store plain for simplicity)
@@ -12,4 +21,5 @@ class EmailOTP(Base):
     attempts = Column(Integer, default=0)
     is_used = Column(Boolean, default=False)
     expires_at = Column(TIMESTAMP, nullable=False)
+    # database clock: rate-limit windows are computed against now() in SQL (otp_purge.window_start)
     created_at = Column(TIMESTAMP, server_default=func.now())
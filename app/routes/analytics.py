@@ -1,116 +1,81 @@
-from flask import Blueprint, jsonify
-import pandas as pd
-import os
+from flask import Blueprint, jsonify, request
+
+from app.screener import catalog, summary
 
 analytics_bp = Blueprint("analytics", __name__)
 
-# Ensure this path matches your VS Code explorer structure
-DATA_DIR = "app/data/uploads"
 
-def safe_to_numeric(series):
-    return pd.to_numeric(series, errors="coerce")
+def _top_n(default):
+    """?n= override for the widget size; None when it is not a positive integer."""
+    raw = request.args.get("n")
+    if raw is None:
+        return default
+    try:
+        n = int(raw)
+    except ValueError:
+        return None
+    return n if n > 0 else None
+
+
+def _bad_n():
+    return jsonify({"error": "n must be a positive integer"}), 400
 
-def clean_symbol(filename):
-    return (
-        filename
-        .replace("cleaned_", "")
-        .replace(".csv", "")
-        .upper()
-    )
 
 @analytics_bp.route("/analytics/stats", methods=["GET"])
 def get_market_stats():
     """
-    Dynamically counts the number of cleaned CSV files for the Universe KPI.
+    Universe KPI straight from the catalog: the same valid symbols the
+    screener and resolver serve (no frames loaded, no directory scan).
+    Cached per catalog version.
     """
     try:
-        if not os.path.exists(DATA_DIR):
+        stats = catalog.stats()
+        if not stats["universe_count"]:
             return jsonify({"universe_count": 0, "status": "No Data"})
 
-        # Count files that follow the cleaned_*.csv naming pattern
-        all_files = os.listdir(DATA_DIR)
-        cleaned_csv_count = len([f for f in all_files if f.startswith("cleaned_") and f.endswith(".csv")])
-        
-        return jsonify({
-            "universe_count": cleaned_csv_count,
-            "status": "Optimal"
-        })
+        return jsonify({**stats, "status": "Optimal"})
     except Exception as e:
         print(f"[ERROR] Stats retrieval failed: {e}")
         return jsonify({"universe_count": 0, "error": str(e)}), 500
 
 @analytics_bp.route("/analytics/top-stocks", methods=["GET"])
 def top_stocks():
-    results = []
-    if not os.path.exists(DATA_DIR):
-        return jsonify([])
-
-    for file in os.listdir(DATA_DIR):
-        if not file.endswith(".csv"):
-            continue
-
-        symbol = clean_symbol(file)
-        path = os.path.join(DATA_DIR, file)
-
-        try:
-            df = pd.read_csv(path)
-            if "close" not in df.columns:
-                continue
-
-            df["close"] = safe_to_numeric(df["close"])
-            close_series = df["close"].dropna()
-
-            if close_series.empty:
-                continue
-
-            last_price = close_series.iloc[-1]
-            results.append({
-                "symbol": symbol,
-                "price": float(last_price)
-            })
-
-        except Exception as e:
-            print(f"[SKIPPED TOP-STOCK] {symbol}: {e}")
-            continue
+    # Top 6 by default for the enlarged "Neat and Clean" Dashboard view
+    n = _top_n(6)
+    if n is None:
+        return _bad_n()
 
-    # Limited to Top 6 for the enlarged "Neat and Clean" Dashboard view
-    results = sorted(results, key=lambda x: x["price"], reverse=True)[:6]
-    return jsonify(results)
+    try:
+        table = summary.table().dropna(subset=["last_close"])
+        if table.empty:
+            return jsonify([])
+
+        top = table.nlargest(n, "last_close")
+        return jsonify([
+            {"symbol": row.symbol, "price": float(row.last_close)}
+            for row in top.itertuples()
+        ])
+    except Exception as e:
+        print(f"[ERROR] Top stocks failed: {e}")
+        return jsonify({"error": str(e)}), 500
 
 @analytics_bp.route("/analytics/volume", methods=["GET"])
 def volume_distribution():
-    data = []
-    if not os.path.exists(DATA_DIR):
-        return jsonify([])
-
-    for file in os.listdir(DATA_DIR):
-        if not file.endswith(".csv"):
-            continue
-
-        symbol = clean_symbol(file)
-        path = os.path.join(DATA_DIR, file)
-
-        try:
-            df = pd.read_csv(path)
-            if "volume" not in df.columns:
-                continue
-
-            df["volume"] = safe_to_numeric(df["volume"])
-            volume_series = df["volume"].dropna()
+    # Top 5 by default for high-fidelity donut chart clarity
+    n = _top_n(5)
+    if n is None:
+        return _bad_n()
 
-            if volume_series.empty:
-                continue
-
-            total_volume = volume_series.sum()
-            data.append({
-                "symbol": symbol,
-                "volume": int(total_volume)
-            })
-
-        except Exception as e:
-            print(f"[SKIPPED VOLUME] {symbol}: {e}")
-            continue
-
-    # Limited to Top 5 for high-fidelity donut chart clarity
-    data = sorted(data, key=lambda x: x["volume"], reverse=True)[:5]
-    return jsonify(data)
\ No newline at end of file
+    try:
+        table = summary.table().dropna(subset=["total_volume"])
+        if table.empty:
+            return jsonify([])
+
+        top = table.nlargest(n, "total_volume")
+        return jsonify([
+            {"symbol": row.symbol, "volume": int(row.total_volume)}
+            for row in top.itertuples()
+        ])
+    except Exception as e:
+        print(f"[ERROR] Volume distribution failed: {e}")
+        return jsonify({"error": str(e)}), 500
@@ -3,15 +3,22 @@ from flask_jwt_extended import create_access_token
 from app.db import SessionLocal
 from app.models.email_user import EmailUser
 from app.models.email_otp import EmailOTP
-from app.utils.hash_utils import hash_password, verify_password
+from app.services import password_pool, otp_purge
 from app.utils.otp import generate_numeric_otp
-from app.services.emailer import send_otp_email
+from app.services import email_queue
 from datetime import datetime, timedelta
 from sqlalchemy import desc
 
 auth_bp = Blueprint("auth", __name__)
 
 # Helper: create and send OTP
+def _busy(e):
+    current_app.logger.warning("Password hashing saturated: %s", str(e))
+    resp = jsonify({"error": "Server busy, retry shortly"})
+    resp.headers["Retry-After"] = "1"
+    return resp, 503
+
+
 def _create_and_send_otp(db, user_id, email, purpose="verify_email"):
     otp = generate_numeric_otp(current_app.config.get("OTP_LENGTH", 6))
     expires_at = datetime.utcnow() + timedelta(
@@ -26,10 +33,11 @@ def _create_and_send_otp(db, user_id, email, purpose="verify_email"):
     db.add(otp_row)
     db.commit()
 
+    # 📨 Delivery happens on the email worker; the request only enqueues
     try:
-        send_otp_email(email, otp, minutes=int(current_app.config.get("OTP_EXPIRE_MINUTES", 10)))
-    except Exception as e:
-        current_app.logger.error("Failed to send OTP email: %s", str(e))
+        email_queue.enqueue_otp(email, otp, minutes=int(current_app.config.get("OTP_EXPIRE_MINUTES", 10)))
+    except email_queue.QueueFull as e:
+        current_app.logger.error("Failed to queue OTP email: %s", str(e))
 
 
 @auth_bp.route("/register", methods=["POST"])
@@ -47,10 +55,16 @@ def register():
         if db.query(EmailUser).filter_by(email=email).first():
             return jsonify({"error": "Email already exists"}), 400
 
+        # 🔐 Hashing runs on the bounded password pool, not this request thread
+        try:
+            password_hash = password_pool.hash_password(password)
+        except password_pool.Busy as e:
+            return _busy(e)
+
         user = EmailUser(
             username=username,
             email=email,
-            password_hash=hash_password(password)
+            password_hash=password_hash
         )
         db.add(user)
         db.commit()
@@ -122,12 +136,18 @@ def resend_otp():
         if not user:
             return jsonify({"error": "user_not_found"}), 404
 
-        active_otps = (
+        # ⏱️ Rate limit on OTPs issued in the last hour (used / expired ones included)
+        window_start = otp_purge.window_start(db)
+        recent_otps = (
             db.query(EmailOTP)
-            .filter_by(user_id=user.id, purpose="verify_email", is_used=False)
+            .filter(
+                EmailOTP.user_id == user.id,
+                EmailOTP.purpose == "verify_email",
+                EmailOTP.created_at >= window_start
+            )
             .count()
         )
-        if active_otps >= 3:
+        if recent_otps >= int(current_app.config.get("MAX_OTP_RESEND_PER_HOUR", 3)):
             return jsonify({"error": "too_many_requests"}), 429
 
         _create_and_send_otp(db, user.id, user.email, purpose="verify_email")
@@ -148,9 +168,18 @@ def login():
     db = SessionLocal()
     try:
         user = db.query(EmailUser).filter_by(email=email).first()
-        if not user or not verify_password(user.password_hash, password):
+        try:
+            ok, new_hash = password_pool.verify_password(user.password_hash if user else None, password)
+        except password_pool.Busy as e:
+            return _busy(e)
+        if not ok:
             return jsonify({"error": "Invalid email or password"}), 401
 
+        # ♻️ Outdated scheme / cost: store the upgraded hash now that we know the password
+        if new_hash:
+            user.password_hash = new_hash
+            db.commit()
+
         if not user.is_email_verified:
             _create_and_send_otp(db, user.id, user.email, purpose="verify_email")
             return jsonify({
@@ -165,3 +194,8 @@ def login():
         return jsonify({"access_token": token}), 200
     finally:
         db.close()
+
+
+@auth_bp.route("/password-hash/stats", methods=["GET"])
+def password_hash_stats():
+    return jsonify(password_pool.stats())
@@ -1,48 +1,77 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+import math
 import traceback
 
 # Core logic imports
 from app.llm.parser import parse_query
-from app.screener.runner import run_screener
-from app.services.stock_resolver import resolve_symbols
+from app.llm import parse_cache
+from app.screener.runner import run_ranked_screener, stream_ranked_screener
+from app.screener.rollups import TIMEFRAMES
+from app.screener.snapshot import latest_records
+from app.embeddings import related_index
+from app.config import RELATED_DEFAULT_LIMIT
+from app.services.stock_resolver import resolve_symbols, GENERIC_KEYWORDS
 from app.services.chat_intelligence import handle_small_talk
 
 chat_bp = Blueprint("chat_bp", __name__)
 
-# --- UTILITIES ---
-
-def safe_numeric(val, default=0, dtype=float):
-    """Safely converts values for robust sorting, handling NaN and empty strings."""
-    if val is None or val == "":
-        return default
-    try:
-        return dtype(val)
-    except (ValueError, TypeError):
-        return default
+TIMEFRAME_UNITS = {"weekly": "weeks", "monthly": "months", "quarterly": "quarters", "yearly": "years"}
 
 # --- CORE LOGIC HANDLERS ---
 
-def apply_intent_sorting(results, intent):
-    """
-    Centralized sorting logic based on AI-detected intent. 
-    """
-    if not intent:
-        return results
-        
-    sort_config = {
-        "low_price":     {"key": lambda x: safe_numeric(x.get("close")), "reverse": False},
-        "high_price":    {"key": lambda x: safe_numeric(x.get("close")), "reverse": True},
-        "high_volume":   {"key": lambda x: safe_numeric(x.get("volume"), dtype=int), "reverse": True},
-        "low_volume":    {"key": lambda x: safe_numeric(x.get("volume"), dtype=int), "reverse": False},
-        "high_delivery": {"key": lambda x: safe_numeric(x.get("%deliverble")), "reverse": True},
-        "high_turnover": {"key": lambda x: safe_numeric(x.get("turnover")), "reverse": True},
-        "high_trades":   {"key": lambda x: safe_numeric(x.get("trades"), dtype=int), "reverse": True}
+def wants_stream(data):
+    """NDJSON when the body sets "stream": true or the client accepts application/x-ndjson."""
+    return bool(data.get("stream")) or "application/x-ndjson" in request.headers.get("Accept", "")
+
+
+def ndjson_line(obj):
+    # NaN is not valid JSON; emit null so line-by-line parsers don't choke
+    clean = {k: (None if isinstance(v, float) and math.isnan(v) else v) for k, v in obj.items()}
+    # the app's JSON provider, so each record serializes exactly as in the jsonify response
+    return current_app.json.dumps(clean) + "\n"
+
+
+def period_message(quarters, timeframe, periods):
+    if quarters:
+        return f"over the last {quarters} quarters"
+    if timeframe and periods:
+        return f"over the last {periods} {TIMEFRAME_UNITS[timeframe]}"
+    if timeframe:
+        return f"on a {timeframe} basis"
+    return "current"
+
+def related_response(query, keywords, symbols, limit):
+    """related_stocks intent: nearest symbols from the local vector index, latest rows attached."""
+    if not any(k.lower() not in GENERIC_KEYWORDS for k in keywords):
+        return {"message": "Which stock should I find similar stocks for?", "data": []}
+
+    # resolved symbols are ranked, best match first
+    target = symbols[0]
+    limit = limit or RELATED_DEFAULT_LIMIT
+    # over-fetch: indexed symbols without a valid latest row are dropped below
+    neighbours = related_index.related(target, limit * 2)
+    if neighbours is None:
+        return {
+            "message": f"{target} is not in the similarity index yet.",
+            "data": [],
+            "status": "not_indexed"
+        }
+
+    latest = {row["symbol"]: row for row in latest_records()}
+    results = [
+        {**latest[symbol], "similarity": score}
+        for symbol, score in neighbours if symbol in latest
+    ][:limit]
+
+    return {
+        "message": f"Found {len(results)} stocks similar to {target}.",
+        "query": query,
+        "intent": "related_stocks",
+        "symbol": target,
+        "data": results,
+        "count": len(results),
+        "total_universe": related_index.size()
     }
-    
-    config = sort_config.get(intent)
-    if config:
-        return sorted(results, key=config["key"], reverse=config["reverse"])
-    return results
 
 # --- MAIN ROUTE ---
 
@@ -70,7 +99,18 @@ def chat():
         # data.get("quarters") captures the manual button click from the UI.
         # parsed.get("quarters") captures it if the user typed "last 4 quarters".
         quarters = data.get("quarters") or parsed.get("quarters") 
-        
+
+        # Other bar sizes (weekly / monthly / quarterly / yearly) come from the rollups
+        timeframe = data.get("timeframe") or parsed.get("timeframe")
+        periods = data.get("periods") or parsed.get("periods")
+        periods = int(periods) if periods and str(periods).isdigit() else None
+        # non-string values (lists, numbers) from the JSON body get the same 400
+        if timeframe and (not isinstance(timeframe, str) or timeframe not in TIMEFRAMES):
+            return jsonify({
+                "error": f"Unsupported timeframe '{timeframe}'.",
+                "timeframes": list(TIMEFRAMES)
+            }), 400
+
         # 3. Symbol Resolution
         symbols = resolve_symbols(parsed)
         
@@ -82,12 +122,55 @@ def chat():
                 "status": "not_found"
             })
 
-        # Global scan logic
-        if not keywords and not symbols and intent:
-            symbols = None 
+        # Global scan logic: "all stocks", "top 5 expensive" etc. name no company,
+        # so screen the latest row of every symbol instead of full histories
+        if not any(k.lower() not in GENERIC_KEYWORDS for k in keywords):
+            symbols = None
 
-        # 4. Data Retrieval with Quarterly Support
-        results = run_screener(filters, symbols, quarters=quarters)
+        limit_val = parsed.get("limit")
+        limit = int(limit_val) if limit_val and str(limit_val).isdigit() else None
+
+        # 🧭 "stocks similar to X": answered from the in-process vector index
+        if intent == "related_stocks":
+            return jsonify(related_response(query, keywords, symbols or [], limit))
+
+        intent_label = intent.replace("_", " ") if intent else "matching"
+        period_msg = period_message(quarters, timeframe, periods)
+
+        # 4b. Streaming mode: header line, then records as NDJSON in chunks
+        if wants_stream(data):
+            chunks, count, total_found = stream_ranked_screener(
+                filters, symbols,
+                quarters=quarters, timeframe=timeframe, periods=periods,
+                intent=intent, limit=limit
+            )
+            header = {
+                "message": (
+                    f"Found {count} {intent_label} stocks {period_msg}." if count
+                    else "No stocks matched your criteria for the selected period."
+                ),
+                "query": query,
+                "intent": intent,
+                "quarters": quarters,
+                "timeframe": "quarterly" if quarters else timeframe,
+                "count": count,
+                "total_universe": total_found
+            }
+
+            def generate():
+                yield ndjson_line(header)
+                for chunk in chunks:
+                    yield "".join(ndjson_line(record) for record in chunk)
+
+            return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+        # 4. Data Retrieval with Quarterly / Timeframe Support
+        # 5. Result Optimization: intent ordering + limit pushed into the screener (top-k)
+        results, total_found = run_ranked_screener(
+            filters, symbols,
+            quarters=quarters, timeframe=timeframe, periods=periods,
+            intent=intent, limit=limit
+        )
 
         if not results:
             return jsonify({
@@ -95,19 +178,7 @@ def chat():
                 "data": []
             })
 
-        # 5. Result Optimization
-        results = apply_intent_sorting(results, intent)
-        
-        limit_val = parsed.get("limit")
-        limit = int(limit_val) if limit_val and str(limit_val).isdigit() else None
-        
-        total_found = len(results)
-        if limit:
-            results = results[:limit]
-
         # 6. Dynamic Response Construction
-        period_msg = f"over the last {quarters} quarters" if quarters else "current"
-        intent_label = intent.replace("_", " ") if intent else "matching"
         message = f"Found {len(results)} {intent_label} stocks {period_msg}."
 
         return jsonify({
@@ -115,6 +186,7 @@ def chat():
             "query": query,
             "intent": intent,
             "quarters": quarters,
+            "timeframe": "quarterly" if quarters else timeframe,
             "data": results,
             "count": len(results),
             "total_universe": total_found
@@ -122,4 +194,10 @@ def chat():
 
     except Exception as e:
         traceback.print_exc()
-        return jsonify({"error": "An internal error occurred.", "details": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": "An internal error occurred.", "details": str(e)}), 500
+
+
+@chat_bp.route("/chat/parse-cache/stats", methods=["GET"])
+def parse_cache_stats():
+    return jsonify(parse_cache.stats())
+
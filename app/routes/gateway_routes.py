@@ -1,6 +1,5 @@
 from flask import Blueprint, request, jsonify
-from app.db import SessionLocal
-from app.models.api_key import APIKey
+from app.services import api_key_cache
 from app.services.forwarder import forward
 from app.config import SERVICES
 
@@ -11,10 +10,8 @@ def validate_api_key():
     if not key:
         return False
 
-    db = SessionLocal()
-    valid = db.query(APIKey).filter_by(key=key).first()
-    db.close()
-    return valid is not None
+    # ⚡ Cached (positive + negative) so proxied calls skip the DB round trip
+    return api_key_cache.is_valid(key)
 
 
 @gateway_bp.before_request
@@ -24,6 +21,13 @@ def before():
             return jsonify({"error": "Invalid API Key"}), 401
 
 
-@gateway_bp.route("/users/<path:path>")
+# bodies stream through in both directions (uploads included)
+@gateway_bp.route("/users/<path:path>", methods=["GET", "POST", "PUT", "PATCH", "DELETE"])
 def users_proxy(path):
     return forward(SERVICES["users"], path)
+
+
+@gateway_bp.route("/metrics/api-keys")
+def api_key_metrics():
+    return jsonify(api_key_cache.stats())
+
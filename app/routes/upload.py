@@ -3,8 +3,10 @@ from flask_cors import cross_origin
 import pandas as pd
 import os
 
-from app.embeddings.embedder import generate_embeddings
-from app.embeddings.vector_db import store_embeddings
+from app.screener import catalog, columnar, rollups, store
+from app.services import upload_jobs
+from app.embeddings import embedder
+from app.config import UPLOAD_DIR
 
 upload_bp = Blueprint("upload_bp", __name__)
 
@@ -22,17 +24,63 @@ def upload_csv():
     if file.filename == "":
         return jsonify({"error": "Empty filename"}), 400
 
-    upload_dir = "app/data/uploads"
-    os.makedirs(upload_dir, exist_ok=True)
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
 
     df = pd.read_csv(file)
-    df.to_csv(os.path.join(upload_dir, file.filename), index=False)
 
-    records = df.to_dict(orient="records")
-    embeddings = generate_embeddings(records)
-    store_embeddings(embeddings, records)
+    # 🧵 Reserve the embedding job slot first: a full queue rejects the
+    # upload before anything is written, so a 503 never hides a live file
+    try:
+        job = upload_jobs.reserve(file.filename, len(df))
+    except upload_jobs.QueueFull as e:
+        return jsonify({
+            "error": "Upload queue is full, retry shortly",
+            "details": str(e),
+            "rows": len(df)
+        }), 503
+
+    try:
+        df.to_csv(os.path.join(UPLOAD_DIR, file.filename), index=False)
+
+        # ⚡ Normalized binary copy so readers skip CSV + date parsing,
+        # plus weekly/monthly/quarterly/yearly rollups (trailing bucket only on appends)
+        normalized, date_col = df, None
+        try:
+            normalized, date_col = store.normalize_frame(df.copy())
+            columnar.write(file.filename, normalized)
+            rollups.ingest(file.filename, normalized, date_col)
+        except Exception as e:
+            print(f"[SIDECAR FAILED] {file.filename}: {e}")
+
+        # 📒 Catalog entry (size, mtime, rows, date range) + new universe version, written atomically
+        catalog.record(file.filename, normalized, date_col)
+        store.invalidate(file.filename)
+    except Exception as e:
+        upload_jobs.release(job["id"], str(e))
+        raise
+
+    # Embedding + vector indexing run in the background job pool
+    job = upload_jobs.start(job["id"], df)
 
     return jsonify({
         "message": "CSV uploaded successfully",
-        "rows": len(df)
-    })
+        "rows": len(df),
+        "job_id": job["id"],
+        "status_url": f"/upload-jobs/{job['id']}"
+    }), 202
+
+
+@upload_bp.route("/upload-jobs/<job_id>", methods=["GET"])
+@cross_origin(origins="http://localhost:5173", supports_credentials=True)
+def upload_job_status(job_id):
+    job = upload_jobs.get(job_id)
+    if not job:
+        return jsonify({"error": "job_not_found"}), 404
+    return jsonify(job)
+
+
+
+@upload_bp.route("/embedding-cache/stats", methods=["GET"])
+@cross_origin(origins="http://localhost:5173", supports_credentials=True)
+def embedding_cache_stats():
+    return jsonify(embedder.cache_stats())
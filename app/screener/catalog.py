@@ -0,0 +1,265 @@
+"""
+Universe catalog: the one manifest of uploaded CSV files.
+
+Each entry records symbol, path, size, mtime, row count and date range;
+the catalog carries a version that moves on every change. /upload-csv
+records the file it wrote (atomically: temp file + os.replace), and every
+reader (store, resolver, analytics) asks the catalog instead of listing
+the upload directory. The version is the cheap cache key for everything
+derived from the universe.
+
+The directory is only walked to bootstrap a missing manifest, or by
+
+    python -m app.screener.catalog    # rebuild from the upload directory
+"""
+import json
+import os
+import threading
+import time
+import pandas as pd
+
+from app.config import UPLOAD_DIR, CATALOG_PATH, STORE_RECHECK_SECONDS
+from app.screener import columnar
+
+# file stems that are not company symbols; kept in the catalog, left out of the universe
+INVALID_SYMBOLS = {"STOCKS", "ALL", "MARKET", "SHARES"}
+
+# in-memory copy of the manifest; "files" is replaced (never mutated) on change
+_catalog = {"version": 0, "entries": {}, "files": [], "mtime": None, "checked_at": float("-inf")}
+_lock = threading.Lock()
+# one directory walk at a time; the walk itself runs without _lock held
+_bootstrap_lock = threading.Lock()
+# table() / stats(), rebuilt only when the entries (and so the version) change
+_derived = {"entries": None, "table": None, "stats": None}
+
+
+def symbol_from_filename(filename):
+    """cleaned_AXISBANK.csv → AXISBANK"""
+    return filename.replace("cleaned_", "").replace(".csv", "").upper()
+
+
+def describe(filename, df=None, date_col=None):
+    """Catalog entry for one file on disk; row count / dates from `df` when given."""
+    path = os.path.join(UPLOAD_DIR, filename)
+    st = os.stat(path)
+
+    if df is None:
+        df, date_col = _parse_once(filename, path, st.st_mtime_ns)
+
+    dates = df[date_col].dropna() if date_col and date_col in df.columns else None
+    return {
+        "file": filename,
+        "symbol": symbol_from_filename(filename),
+        "path": path,
+        "size": st.st_size,
+        "mtime": st.st_mtime_ns,
+        "rows": int(len(df)),
+        "first_date": dates.min().strftime("%Y-%m-%d") if dates is not None and len(dates) else None,
+        "last_date": dates.max().strftime("%Y-%m-%d") if dates is not None and len(dates) else None,
+    }
+
+
+def _parse_once(filename, path, mtime_ns):
+    """
+    The normalized frame for a bootstrap entry. A fresh sidecar is read as
+    is; otherwise the CSV is parsed and its sidecar written, so the store's
+    cold load that follows reads the binary copy instead of parsing again.
+    """
+    from app.screener.store import find_date_col, parse_csv
+
+    df = columnar.read(filename, mtime_ns)
+    if df is not None:
+        return df, find_date_col(df)
+
+    df, date_col = parse_csv(path)
+    try:
+        columnar.write(filename, df)
+    except OSError as e:
+        print(f"[CATALOG] no sidecar for {filename}: {e}")
+    return df, date_col
+
+
+# ---------------- MANIFEST ----------------
+
+def _apply(manifest, mtime):
+    _catalog.update(
+        version=manifest["version"],
+        entries=manifest["entries"],
+        files=sorted(manifest["entries"]),
+        mtime=mtime,
+    )
+
+
+def _save():
+    """Write the manifest atomically (caller holds the lock)."""
+    os.makedirs(os.path.dirname(CATALOG_PATH) or ".", exist_ok=True)
+    tmp = f"{CATALOG_PATH}.{os.getpid()}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump({"version": _catalog["version"], "entries": _catalog["entries"]}, fh)
+    os.replace(tmp, CATALOG_PATH)
+    _catalog["mtime"] = os.stat(CATALOG_PATH).st_mtime_ns
+
+
+def _refresh(force=False):
+    """
+    Pick up manifest changes made by other processes (one stat, at most every
+    STORE_RECHECK_SECONDS). Caller holds the lock. Returns False when there
+    is no readable manifest and the directory has to be walked.
+    """
+    now = time.monotonic()
+    # no throttling before a manifest is in memory: wait for the bootstrap instead
+    loaded = _catalog["mtime"] is not None
+    if not force and loaded and now - _catalog["checked_at"] < STORE_RECHECK_SECONDS:
+        return True
+    _catalog["checked_at"] = now
+
+    try:
+        mtime = os.stat(CATALOG_PATH).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+    if mtime == _catalog["mtime"]:
+        return True
+    try:
+        with open(CATALOG_PATH) as fh:
+            _apply(json.load(fh), mtime)
+    except ValueError:
+        return False
+    return True
+
+
+def _ensure(force=False):
+    """_refresh, bootstrapping a missing manifest from the upload directory first."""
+    with _lock:
+        if _refresh(force):
+            return
+    with _bootstrap_lock:
+        with _lock:
+            if _refresh(force=True):   # another thread bootstrapped meanwhile
+                return
+        _install(_scan())
+
+
+def _scan():
+    """Full directory walk (bootstrap / CLI only); runs without the lock."""
+    entries = {}
+    if os.path.isdir(UPLOAD_DIR):
+        for filename in sorted(os.listdir(UPLOAD_DIR)):
+            if not filename.endswith(".csv"):
+                continue
+            try:
+                entries[filename] = describe(filename)
+            except Exception as e:
+                print(f"[CATALOG] skipped {filename}: {e}")
+    return entries
+
+
+def _install(entries):
+    with _lock:
+        _catalog["version"] += 1
+        _catalog.update(entries=entries, files=sorted(entries))
+        _save()
+    print(f"[CATALOG] indexed {len(entries)} file(s), version {_catalog['version']}")
+
+
+# ---------------- API ----------------
+
+def record(filename, df=None, date_col=None):
+    """Add / replace one file's entry and bump the version (called by /upload-csv)."""
+    entry = describe(filename, df, date_col)
+    _ensure(force=True)
+    with _lock:
+        entries = dict(_catalog["entries"], **{filename: entry})
+        _catalog["version"] += 1
+        _catalog.update(entries=entries, files=sorted(entries))
+        _save()
+        return _catalog["version"]
+
+
+def remove(filename):
+    _ensure(force=True)
+    with _lock:
+        if filename not in _catalog["entries"]:
+            return _catalog["version"]
+        entries = {k: v for k, v in _catalog["entries"].items() if k != filename}
+        _catalog["version"] += 1
+        _catalog.update(entries=entries, files=sorted(entries))
+        _save()
+        return _catalog["version"]
+
+
+def rebuild():
+    with _bootstrap_lock:
+        _install(_scan())
+    return _catalog["version"]
+
+
+def version():
+    _ensure()
+    with _lock:
+        return _catalog["version"]
+
+
+def files():
+    """Sorted filenames; the same list object until the catalog changes."""
+    _ensure()
+    with _lock:
+        return _catalog["files"]
+
+
+def get(filename):
+    _ensure()
+    with _lock:
+        return _catalog["entries"].get(filename)
+
+
+def entries():
+    """All entries in file order (treat as read-only)."""
+    _ensure()
+    with _lock:
+        return [_catalog["entries"][f] for f in _catalog["files"]]
+
+
+def universe():
+    """Entries of valid symbols: the set the screener, resolver and analytics all serve."""
+    return [e for e in entries() if e["symbol"] and e["symbol"] not in INVALID_SYMBOLS]
+
+
+def table():
+    """Universe entries as a DataFrame (dates parsed), for aggregate KPIs (treat as read-only)."""
+    return _derive()["table"]
+
+
+def stats():
+    """Universe KPIs from the manifest alone: symbol count, rows, date range, version."""
+    return _derive()["stats"]
+
+
+def _derive():
+    _ensure()
+    with _lock:
+        if _derived["entries"] is _catalog["entries"]:
+            return _derived
+
+        universe_entries = [
+            e for e in (_catalog["entries"][f] for f in _catalog["files"])
+            if e["symbol"] and e["symbol"] not in INVALID_SYMBOLS
+        ]
+        df = pd.DataFrame(universe_entries, columns=["file", "symbol", "path", "size", "mtime", "rows",
+                                                     "first_date", "last_date"])
+        df["first_date"] = pd.to_datetime(df["first_date"])
+        df["last_date"] = pd.to_datetime(df["last_date"])
+
+        first, last = df["first_date"].min(), df["last_date"].max()
+        _derived.update(entries=_catalog["entries"], table=df, stats={
+            "universe_count": len(df),
+            "total_rows": int(df["rows"].sum()),
+            "first_date": first.strftime("%Y-%m-%d") if not pd.isna(first) else None,
+            "last_date": last.strftime("%Y-%m-%d") if not pd.isna(last) else None,
+            "version": _catalog["version"],
+        })
+        return _derived
+
+
+if __name__ == "__main__":
+    rebuild()
@@ -0,0 +1,117 @@
+"""
+Binary columnar copies of the uploaded CSVs.
+
+Each symbol file is stored already normalized (numeric columns coerced,
+dates parsed, rows sorted) so readers skip text parsing and the slow
+mixed-format date inference. Feather is used when pyarrow is installed,
+otherwise a NumPy .npz archive.
+
+Convert the CSVs already in the upload directory with:
+
+    python -m app.screener.columnar
+"""
+import os
+import threading
+import numpy as np
+import pandas as pd
+
+from app.config import UPLOAD_DIR
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # optional dependency
+    feather = None
+
+SIDECAR_DIR = os.path.join(UPLOAD_DIR, ".columnar")
+EXTENSION = ".feather" if feather else ".npz"
+
+_NULL_PREFIX = "__null__:"
+
+
+def sidecar_path(filename, kind=None):
+    """`kind` names a derived frame of the same file (e.g. a weekly rollup)."""
+    stem = os.path.splitext(filename)[0]
+    if kind:
+        stem = f"{stem}.{kind}"
+    return os.path.join(SIDECAR_DIR, stem + EXTENSION)
+
+
+def write(filename, df, kind=None):
+    """Persist a normalized frame next to the uploads (atomic replace)."""
+    os.makedirs(SIDECAR_DIR, exist_ok=True)
+    path = sidecar_path(filename, kind)
+    # per-writer temp name: concurrent ingests of one file must not share it
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    df = df.reset_index(drop=True)
+
+    if feather:
+        feather.write_feather(df, tmp)
+    else:
+        arrays = {}
+        for i, col in enumerate(df.columns):
+            series = df[col]
+            if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series):
+                arrays[f"{i}"] = series.to_numpy()
+            else:
+                # text columns: unicode array plus a null mask, no pickling
+                arrays[f"{i}"] = series.fillna("").astype(str).to_numpy(dtype=str)
+                arrays[f"{_NULL_PREFIX}{i}"] = series.isna().to_numpy()
+        arrays["__columns__"] = np.array([str(c) for c in df.columns], dtype=str)
+        with open(tmp, "wb") as fh:
+            np.savez(fh, **arrays)
+
+    os.replace(tmp, path)
+    return path
+
+
+def read(filename, source_mtime_ns=None, kind=None):
+    """
+    Load the sidecar for an uploaded file, or None if it is missing or
+    older than the CSV it was built from.
+    """
+    path = sidecar_path(filename, kind)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    if source_mtime_ns is not None and st.st_mtime_ns < source_mtime_ns:
+        return None
+
+    try:
+        if feather:
+            return feather.read_feather(path)
+
+        with np.load(path, allow_pickle=False) as npz:
+            columns = list(npz["__columns__"])
+            data = {}
+            for i, col in enumerate(columns):
+                values = npz[f"{i}"]
+                mask_key = f"{_NULL_PREFIX}{i}"
+                if mask_key in npz.files:
+                    values = pd.Series(values).mask(npz[mask_key])
+                data[col] = values
+            return pd.DataFrame(data, columns=columns)
+    except Exception as e:
+        print(f"[SIDECAR UNREADABLE] {filename}: {e}")
+        return None
+
+
+def convert_uploads():
+    """One-shot conversion of every CSV already in the upload directory."""
+    from app.screener.store import list_files, parse_csv
+
+    converted = 0
+    for filename in list_files():
+        try:
+            df, _ = parse_csv(os.path.join(UPLOAD_DIR, filename))
+            write(filename, df)
+            converted += 1
+            print(f"[CONVERTED] {filename} → {sidecar_path(filename)}")
+        except Exception as e:
+            print(f"[SKIPPED CONVERT] {filename}: {e}")
+    return converted
+
+
+if __name__ == "__main__":
+    print(f"Converted {convert_uploads()} file(s) to {EXTENSION}")
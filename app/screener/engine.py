@@ -0,0 +1,290 @@
+"""
+Vectorized whole-universe screening.
+
+The universe is held as one long panel per column layout: every symbol's
+date-sorted frame concatenated, with an integer symbol key per row. A
+dashboard screen is then one combined boolean mask over the panel plus a
+groupby-last (the last masked row of each key run) instead of a Python
+loop over symbols.
+"""
+import operator
+import threading
+import numpy as np
+import pandas as pd
+
+from app.screener import rollups, store
+from app.screener.ranking import INTENT_SORT, sort_key, top_k
+
+FILTER_OPS = {
+    "<": operator.lt,
+    ">": operator.gt,
+    "==": operator.eq,
+    "<=": operator.le,
+    ">=": operator.ge,
+}
+
+# timeframe (None = daily) -> {"version", "groups"}
+_panels = {}
+_lock = threading.Lock()
+
+
+# ---------------- PANEL ----------------
+
+def build_panel(frames):
+    """
+    Concatenate (symbol, df, date_col) frames into panels keyed by symbol.
+    Frames are grouped by column layout so dtypes never get widened by concat.
+    """
+    layouts = {}
+    for order, (symbol, df, date_col) in enumerate(frames):
+        if df.empty:
+            continue
+        layout = (tuple(df.columns), tuple(str(t) for t in df.dtypes), date_col)
+        layouts.setdefault(layout, []).append((order, symbol, df))
+
+    groups = []
+    for (_, _, date_col), members in layouts.items():
+        groups.append({
+            "data": pd.concat([df for _, _, df in members], ignore_index=True),
+            "key": np.repeat(np.arange(len(members)), [len(df) for _, _, df in members]),
+            "order": np.array([order for order, _, _ in members]),
+            "symbols": [symbol for _, symbol, _ in members],
+            "date_col": date_col,
+        })
+    return groups
+
+
+def timeframe_frames(entries, timeframe):
+    """(symbol, df, date_col) per entry: daily frames, or rollup bars."""
+    for filename, symbol, df, date_col in entries:
+        if not timeframe:
+            yield symbol, df, date_col
+            continue
+
+        if not date_col:
+            continue
+        bars = rollups.get_bars(filename, df, date_col, timeframe)
+        if bars is not None:
+            yield symbol, bars, date_col
+
+
+def universe_panel(timeframe=None):
+    """
+    Panel over the whole store (daily, or one rollup timeframe), rebuilt
+    only when the store version moves.
+    """
+    version = store.sync()
+
+    with _lock:
+        cached = _panels.get(timeframe)
+        if cached and cached["version"] == version:
+            return cached["groups"]
+
+        groups = build_panel(list(timeframe_frames(store.iter_entries(), timeframe)))
+        _panels[timeframe] = {"version": version, "groups": groups}
+    return groups
+
+
+# ---------------- FILTERS ----------------
+
+def filter_mask(df, filters):
+    """All filters combined into one boolean mask (NaN never matches)."""
+    mask = np.ones(len(df), dtype=bool)
+    for f in filters:
+        field, op = f["field"], FILTER_OPS.get(f["operator"])
+        if field not in df.columns or op is None:
+            continue
+        mask &= op(df[field], f["value"]).to_numpy(dtype=bool, na_value=False)
+    return mask
+
+
+def last_per_key(keys, mask):
+    """Positions of the last masked row for every key (keys are run-sorted)."""
+    idx = np.flatnonzero(mask)
+    if not len(idx):
+        return idx
+    k = keys[idx]
+    return idx[np.append(k[1:] != k[:-1], True)]
+
+
+def tail_mask(keys, periods):
+    """Keep only the last `periods` rows of every key run."""
+    if not periods:
+        return np.ones(len(keys), dtype=bool)
+    return pd.Series(keys).groupby(keys).cumcount(ascending=False).to_numpy() < periods
+
+
+# ---------------- SCREENS ----------------
+
+def clean_latest(latest, date_col=None):
+    """
+    Numeric and date cleanup of dashboard rows for JSON stability (in place).
+    Returns the keep-mask: rows without a positive close are dropped.
+    """
+    latest["close"] = latest["close"].fillna(0.0).astype(float) if "close" in latest else 0.0
+    latest["volume"] = latest["volume"].fillna(0).astype(int) if "volume" in latest else 0
+    if date_col in latest:
+        # Same "YYYY-MM-DD" strings as history rows, not Timestamps
+        latest[date_col] = latest[date_col].dt.strftime('%Y-%m-%d')
+    return (latest["close"] > 0).to_numpy()
+
+
+def latest_rows(groups, filters, periods=None):
+    """
+    Yield (latest, orders) per panel group for dashboard screens: the cleaned
+    latest matching row of each symbol and its file order. No dicts are built.
+    `periods` limits the match to each symbol's last N rows (rollup bars).
+    """
+    for group in groups:
+        data, keys = group["data"], group["key"]
+
+        rows = last_per_key(keys, tail_mask(keys, periods) & filter_mask(data, filters))
+        if not len(rows):
+            continue
+
+        latest = data.iloc[rows].copy()
+        latest_keys = keys[rows]
+        latest["symbol"] = [group["symbols"][k] for k in latest_keys]
+
+        keep = clean_latest(latest, group["date_col"])
+        yield latest[keep], group["order"][latest_keys][keep]
+
+
+def history_rows(frames, filters, periods=None):
+    """Yield (symbol, matching rows, date_col) for StockDetail screens."""
+    for symbol, df, date_col in frames:
+        if df.empty:
+            continue
+
+        if periods:
+            df = df.tail(periods)
+
+        df = df[filter_mask(df, filters)]
+        if not df.empty:
+            yield symbol, df, date_col
+
+
+def history_records(symbol, df, date_col):
+    df = df.copy()
+    df["symbol"] = symbol
+    if date_col:
+        # Format dates for frontend JS compatibility, whole column at once
+        df[date_col] = df[date_col].dt.strftime('%Y-%m-%d')
+    return df.to_dict('records')
+
+
+def screen_latest(groups, filters, periods=None):
+    """Dashboard mode: latest matching row per symbol, in file order."""
+    ranked = []
+    for latest, orders in latest_rows(groups, filters, periods):
+        ranked.extend(zip(orders, latest.to_dict('records')))
+
+    ranked.sort(key=lambda item: item[0])
+    return [record for _, record in ranked]
+
+
+def screen_history(frames, filters, periods=None):
+    """StockDetail mode: every matching row of the requested symbols."""
+    results = []
+    for symbol, df, date_col in history_rows(frames, filters, periods):
+        results.extend(history_records(symbol, df, date_col))
+    return results
+
+
+def screen(filters, symbols=None, timeframe=None, periods=None):
+    """
+    Same contract as runner.run_screener (symbols already upper-cased).
+    `timeframe` switches from daily rows to rollup bars.
+    """
+    if symbols:
+        frames = timeframe_frames(store.iter_entries(symbols), timeframe)
+        return screen_history(frames, filters, periods)
+    return screen_latest(universe_panel(timeframe), filters, periods)
+
+
+# ---------------- RANKED (TOP-K) ----------------
+
+def select(parts, intent, limit=None):
+    """
+    Rank rows spread over several frames without building dicts.
+    `parts` is [(df, tiebreak)]; tiebreak keeps the unsorted result order
+    for equal keys, like a stable sort. Returns (owner, position, total):
+    the part index and row position of each selected row, in ranked order.
+    """
+    if not parts:
+        return np.array([], dtype=int), np.array([], dtype=int), 0
+
+    keys = np.concatenate([sort_key(df, intent) for df, _ in parts])
+    ties = np.concatenate([tiebreak for _, tiebreak in parts])
+    owner = np.concatenate([np.full(len(df), i) for i, (df, _) in enumerate(parts)])
+    position = np.concatenate([np.arange(len(df)) for df, _ in parts])
+
+    reverse = INTENT_SORT[intent][2] if intent in INTENT_SORT else False
+    chosen = top_k(keys, ties, reverse, limit)
+    return owner[chosen], position[chosen], len(keys)
+
+
+def materialize(parts, owner, position, to_records):
+    """Build dicts for the selected rows only, keeping the ranked order."""
+    records = [None] * len(owner)
+    for i in np.unique(owner):
+        slots = np.flatnonzero(owner == i)
+        for slot, record in zip(slots, to_records(i, position[slots])):
+            records[slot] = record
+    return records
+
+
+def ranked_selection(filters, symbols=None, timeframe=None, periods=None, intent=None, limit=None):
+    """
+    Match and rank without building dicts.
+    Returns (parts, owner, position, total, to_records) for materialize().
+    """
+    if symbols:
+        frames = timeframe_frames(store.iter_entries(symbols), timeframe)
+        matched = list(history_rows(frames, filters, periods))
+
+        parts, offset = [], 0
+        for _, df, _ in matched:
+            parts.append((df, np.arange(offset, offset + len(df))))
+            offset += len(df)
+
+        def to_records(i, rows):
+            symbol, df, date_col = matched[i]
+            return history_records(symbol, df.iloc[rows], date_col)
+    else:
+        parts = list(latest_rows(universe_panel(timeframe), filters, periods))
+
+        def to_records(i, rows):
+            return parts[i][0].iloc[rows].to_dict('records')
+
+    owner, position, total = select(parts, intent, limit)
+    return parts, owner, position, total, to_records
+
+
+def screen_ranked(filters, symbols=None, timeframe=None, periods=None, intent=None, limit=None):
+    """
+    screen() + intent ordering + limit in one pass: keys are compared as
+    arrays and only the top `limit` rows become dicts. Returns (results, total).
+    """
+    parts, owner, position, total, to_records = ranked_selection(
+        filters, symbols, timeframe, periods, intent, limit
+    )
+    return materialize(parts, owner, position, to_records), total
+
+
+def stream_ranked(filters, symbols=None, timeframe=None, periods=None, intent=None, limit=None,
+                  chunk_size=500):
+    """
+    Streaming variant of screen_ranked: returns (chunks, count, total) where
+    `chunks` lazily yields lists of at most `chunk_size` records.
+    """
+    parts, owner, position, total, to_records = ranked_selection(
+        filters, symbols, timeframe, periods, intent, limit
+    )
+
+    def chunks():
+        for start in range(0, len(owner), chunk_size):
+            end = start + chunk_size
+            yield materialize(parts, owner[start:end], position[start:end], to_records)
+
+    return chunks(), len(owner), total
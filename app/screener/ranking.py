@@ -0,0 +1,76 @@
+"""
+Intent → sort order for screener results.
+Shared by the ranked screener runner, the latest-row snapshot and the
+engine's top-k selection.
+"""
+import numpy as np
+import pandas as pd
+
+
+def safe_numeric(val, default=0, dtype=float):
+    """Safely converts values for robust sorting, handling NaN and empty strings."""
+    if val is None or val == "":
+        return default
+    try:
+        return dtype(val)
+    except (ValueError, TypeError):
+        return default
+
+
+# intent -> (column, dtype, descending)
+INTENT_SORT = {
+    "low_price":     ("close", float, False),
+    "high_price":    ("close", float, True),
+    "high_volume":   ("volume", int, True),
+    "low_volume":    ("volume", int, False),
+    "high_delivery": ("%deliverble", float, True),
+    "high_turnover": ("turnover", float, True),
+    "high_trades":   ("trades", int, True),
+}
+
+
+def rank_records(records, intent):
+    """Stable sort of result dicts by the column the intent points at."""
+    config = INTENT_SORT.get(intent)
+    if not config:
+        return records
+
+    column, dtype, reverse = config
+    return sorted(
+        records,
+        key=lambda x: safe_numeric(x.get(column), dtype=dtype),
+        reverse=reverse
+    )
+
+
+def sort_key(df, intent):
+    """
+    Vectorized safe_numeric over the intent's column (zeros without an intent).
+    int keys truncate and treat NaN as 0; float keys keep NaN (ranked last).
+    """
+    config = INTENT_SORT.get(intent)
+    if not config or config[0] not in df.columns:
+        return np.zeros(len(df))
+
+    column, dtype, _ = config
+    values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    if dtype is int:
+        values = np.trunc(np.nan_to_num(values, nan=0.0))
+    return values
+
+
+def top_k(keys, ties, reverse=False, limit=None):
+    """
+    Indices of the first `limit` rows ordered by key (stable on `ties`).
+    Uses argpartition-style selection so only the candidates get sorted.
+    """
+    key = -keys if reverse else keys
+    key = np.where(np.isnan(key), np.inf, key)
+
+    candidates = np.arange(len(key))
+    if limit and limit < len(key):
+        kth = np.partition(key, limit - 1)[limit - 1]
+        candidates = np.flatnonzero(key <= kth)
+
+    order = candidates[np.lexsort((ties[candidates], key[candidates]))]
+    return order[:limit] if limit else order
@@ -0,0 +1,144 @@
+"""
+Multi-timeframe OHLCV rollups (weekly / monthly / quarterly / yearly).
+
+Bars are computed at ingest and persisted next to the uploads as columnar
+sidecars (`<file>.<timeframe>.feather|npz`) with a small JSON meta file.
+When an upload only appends daily rows, only the trailing bucket onwards
+is recomputed; everything before it is reused as-is.
+"""
+import json
+import os
+import threading
+import numpy as np
+import pandas as pd
+
+from app.screener import catalog, columnar
+
+TIMEFRAMES = {
+    "weekly": "W",
+    "monthly": "ME",
+    "quarterly": "QE",
+    "yearly": "YE",
+}
+
+BAR_AGG = {
+    'close': 'last',
+    'open': 'first',
+    'volume': 'sum',
+    'high': 'max',
+    'low': 'min',
+    'turnover': 'sum',
+    'trades': 'sum'
+}
+
+# (filename, timeframe) -> (df the bars were built from, bars)
+_cache = {}
+_lock = threading.Lock()
+
+
+def resample(df, date_col, freq):
+    """Bars for one symbol: date column first, empty buckets dropped."""
+    bars = df.set_index(date_col).resample(freq).agg(BAR_AGG).dropna()
+    return bars.reset_index()
+
+
+def bucket_label(ts, freq):
+    """Label (right edge) of the bucket that contains `ts`."""
+    return pd.Series([0], index=pd.DatetimeIndex([ts])).resample(freq).sum().index[0]
+
+
+def supports(df, date_col):
+    return bool(date_col) and not df.empty and all(c in df.columns for c in BAR_AGG)
+
+
+def _meta_path(filename):
+    return os.path.splitext(columnar.sidecar_path(filename, "rollups"))[0] + ".json"
+
+
+def _fingerprint(df, date_col):
+    return {
+        "rows": int(len(df)),
+        "last_date": df[date_col].iloc[-1].isoformat(),
+        "close_sum": float(np.nansum(df["close"].to_numpy(dtype=float))),
+    }
+
+
+def _appended_since(meta, df, date_col):
+    """True when `df` only adds rows after the history the meta was built from."""
+    if not meta:
+        return False
+
+    last_date = pd.Timestamp(meta["last_date"])
+    prefix = df[df[date_col] <= last_date]
+    if len(prefix) != meta["rows"]:
+        return False
+    return np.isclose(np.nansum(prefix["close"].to_numpy(dtype=float)), meta["close_sum"])
+
+
+def ingest(filename, df, date_col):
+    """
+    Refresh and persist every timeframe for one uploaded file.
+    Returns {timeframe: bars}, or {} when the frame cannot be rolled up.
+    """
+    if not supports(df, date_col):
+        return {}
+
+    try:
+        with open(_meta_path(filename)) as fh:
+            meta = json.load(fh)
+    except (FileNotFoundError, ValueError):
+        meta = None
+
+    incremental = _appended_since(meta, df, date_col)
+    result = {}
+
+    for timeframe, freq in TIMEFRAMES.items():
+        old = columnar.read(filename, kind=timeframe) if incremental else None
+
+        if old is None:
+            bars = resample(df, date_col, freq)
+        else:
+            # ♻️ Only the bucket holding the previous last day onwards can change
+            label = bucket_label(pd.Timestamp(meta["last_date"]), freq)
+            prev = label - pd.tseries.frequencies.to_offset(freq)
+            tail = resample(df[df[date_col] > prev], date_col, freq)
+            bars = pd.concat([old[old[date_col] <= prev], tail], ignore_index=True)
+
+        columnar.write(filename, bars, kind=timeframe)
+        result[timeframe] = bars
+
+    os.makedirs(os.path.dirname(_meta_path(filename)), exist_ok=True)
+    with open(_meta_path(filename), "w") as fh:
+        json.dump(_fingerprint(df, date_col), fh)
+
+    with _lock:
+        for timeframe, bars in result.items():
+            _cache[(filename, timeframe)] = (df, bars)
+    return result
+
+
+def get_bars(filename, df, date_col, timeframe):
+    """
+    Bars of one timeframe for a loaded frame: memory cache, then the
+    persisted sidecar (if newer than the CSV), then an ingest.
+    """
+    with _lock:
+        hit = _cache.get((filename, timeframe))
+    if hit and hit[0] is df:
+        return hit[1]
+
+    if not supports(df, date_col):
+        return None
+
+    known = catalog.get(filename)
+    if known is None:
+        return None
+    source_mtime = known["mtime"]
+
+    bars = columnar.read(filename, source_mtime, kind=timeframe)
+    if bars is None:
+        bars = ingest(filename, df, date_col).get(timeframe)
+    else:
+        with _lock:
+            _cache[(filename, timeframe)] = (df, bars)
+    return bars
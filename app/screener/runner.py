@@ -1,99 +1,147 @@
 import pandas as pd
-import os
 
-UPLOAD_DIR = "app/data/uploads"
-NUMERIC_COLS = ["open", "high", "low", "close", "volume", "vwap", "turnover", "trades", "%deliverble"]
-INVALID_SYMBOLS = {"STOCKS", "ALL", "MARKET", "SHARES"}
+from app.config import STREAM_CHUNK_ROWS
+from app.screener import engine, snapshot, store
+from app.screener.ranking import INTENT_SORT
+from app.screener.rollups import BAR_AGG, TIMEFRAMES
+from app.screener.store import NUMERIC_COLS, INVALID_SYMBOLS
+
+def run_screener(filters, symbols=None, quarters=None, timeframe=None, periods=None):
+    """
+    Screen the uploaded universe.
+
+    With `symbols` every matching history row is returned (StockDetail charts),
+    otherwise one latest matching row per symbol (dashboard mode).
+    `quarters=N` is shorthand for timeframe="quarterly", periods=N; other
+    timeframes (weekly / monthly / yearly) are served from the cached rollups.
+    Backed by the vectorized engine; results match run_screener_loop.
+    """
+    symbols, timeframe, periods = _screen_args(symbols, quarters, timeframe, periods)
+
+    # ⚡ Unfiltered dashboard screens come straight from the latest-row snapshot
+    if not symbols and not filters and not timeframe and not periods:
+        return snapshot.latest_records()
+
+    return engine.screen(filters, symbols, timeframe=timeframe, periods=periods)
+
+
+def run_ranked_screener(filters, symbols=None, quarters=None, timeframe=None, periods=None,
+                        intent=None, limit=None):
+    """
+    run_screener with the intent ordering and limit pushed down.
+    Only the top `limit` rows are turned into dicts; returns (results, total).
+    """
+    symbols, timeframe, periods = _screen_args(symbols, quarters, timeframe, periods)
+
+    if not symbols and not filters and not timeframe and not periods:
+        records = snapshot.latest_records()
+        ranked = records.ranked(intent) if intent in INTENT_SORT else records
+        return list(ranked[:limit] if limit else ranked), len(records)
+
+    return engine.screen_ranked(
+        filters, symbols, timeframe=timeframe, periods=periods, intent=intent, limit=limit
+    )
+
+
+def stream_ranked_screener(filters, symbols=None, quarters=None, timeframe=None, periods=None,
+                           intent=None, limit=None, chunk_size=STREAM_CHUNK_ROWS):
+    """
+    run_ranked_screener for streaming responses.
+    Returns (chunks, count, total); each chunk is a list of at most chunk_size records.
+    """
+    symbols, timeframe, periods = _screen_args(symbols, quarters, timeframe, periods)
+
+    if not symbols and not filters and not timeframe and not periods:
+        records, total = run_ranked_screener([], intent=intent, limit=limit)
+        chunks = (records[i:i + chunk_size] for i in range(0, len(records), chunk_size))
+        return chunks, len(records), total
+
+    return engine.stream_ranked(
+        filters, symbols, timeframe=timeframe, periods=periods,
+        intent=intent, limit=limit, chunk_size=chunk_size
+    )
+
+
+def _screen_args(symbols, quarters, timeframe, periods):
+    if symbols:
+        symbols = [s.upper() for s in symbols]
 
-def run_screener(filters, symbols=None, quarters=None):
-    results = []
+    if quarters:
+        timeframe, periods = "quarterly", quarters
+
+    if timeframe and timeframe not in TIMEFRAMES:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
 
-    if not os.path.exists(UPLOAD_DIR):
-        return results
+    return symbols, timeframe, periods
+
+
+def run_screener_loop(filters, symbols=None, quarters=None):
+    """
+    Reference per-symbol implementation of run_screener.
+    Kept for parity checks and as the baseline in benchmarks/.
+    """
+    results = []
 
     if symbols:
         symbols = [s.upper() for s in symbols]
 
-    for file in os.listdir(UPLOAD_DIR):
-        if not file.endswith(".csv"):
-            continue
-
-        symbol = file.replace("cleaned_", "").replace(".csv", "").upper()
-
-        if not symbol or symbol in INVALID_SYMBOLS:
-            continue
-
-        if symbols and symbol not in symbols:
-            continue
-
-        df = pd.read_csv(os.path.join(UPLOAD_DIR, file))
-
-        if df.empty:
-            continue
-
-        # 🔒 Numeric normalization
-        for col in NUMERIC_COLS:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors="coerce")
-
-        # 📅 Date parsing
-        date_col = next((c for c in df.columns if c.lower() == "date"), None)
-        if date_col:
-            df[date_col] = pd.to_datetime(df[date_col], errors="coerce", dayfirst=True, format='mixed')
-            df = df.dropna(subset=[date_col]) 
-            df = df.sort_values(date_col)
-
-        # ✅ FIXED: Quarterly Aggregation Logic
-        if quarters and date_col:
-            df = df.set_index(date_col)
-            # QE = Quarter End. We take the 'last' price to represent the end of that quarter
-            df = df.resample('QE').agg({
-                'close': 'last',      
-                'open': 'first',      
-                'volume': 'sum',      
-                'high': 'max',        
-                'low': 'min',         
-                'turnover': 'sum',    
-                'trades': 'sum'       
-            }).dropna()
-            
-            # Take only the requested number of quarters
-            df = df.tail(quarters).reset_index()
-            df = df.rename(columns={'index': date_col})
-
-        # Apply standard filters
-        for f in filters:
-            field, op, val = f["field"], f["operator"], f["value"]
-            if field not in df.columns: continue
-            if op == "<": df = df[df[field] < val]
-            elif op == ">": df = df[df[field] > val]
-            elif op == "==": df = df[df[field] == val]
-            elif op == "<=": df = df[df[field] <= val]
-            elif op == ">=": df = df[df[field] >= val]
-
-        if df.empty:
-            continue
-
-        # ✅ DYNAMIC OUTPUT LOGIC
-        # If symbols are provided, we are on the StockDetail page and need ALL rows for the chart
-        if symbols and len(symbols) > 0:
-            history_records = df.to_dict('records')
-            for record in history_records:
-                record["symbol"] = symbol
-                if date_col in record:
-                    # Format date for frontend JS compatibility
-                    record[date_col] = record[date_col].strftime('%Y-%m-%d')
-            results.extend(history_records)
-        else:
-            # DASHBOARD MODE: Return only the final aggregated row
-            latest = df.iloc[-1].to_dict()
-            latest["symbol"] = symbol
-            
-            # Numeric cleanup for JSON stability
-            latest["close"] = float(latest.get("close", 0)) if pd.notna(latest.get("close")) else 0.0
-            latest["volume"] = int(latest.get("volume", 0)) if pd.notna(latest.get("volume")) else 0
-            
-            if latest["close"] > 0:
-                results.append(latest)
-
-    return results
\ No newline at end of file
+    # ⚡ Already parsed, typed and date-sorted by the shared store
+    for symbol, df, date_col in store.iter_universe(symbols):
+        results.extend(
+            screen_frame(symbol, df, date_col, filters, history=bool(symbols), quarters=quarters)
+        )
+
+    return results
+
+
+def screen_frame(symbol, df, date_col, filters, history=False, quarters=None):
+    if df.empty:
+        return []
+
+    # ✅ FIXED: Quarterly Aggregation Logic
+    if quarters and date_col:
+        df = df.set_index(date_col)
+        # QE = Quarter End. We take the 'last' price to represent the end of that quarter
+        df = df.resample('QE').agg(BAR_AGG).dropna()
+
+        # Take only the requested number of quarters
+        df = df.tail(quarters).reset_index()
+        df = df.rename(columns={'index': date_col})
+
+    # Apply standard filters
+    for f in filters:
+        field, op, val = f["field"], f["operator"], f["value"]
+        if field not in df.columns: continue
+        if op == "<": df = df[df[field] < val]
+        elif op == ">": df = df[df[field] > val]
+        elif op == "==": df = df[df[field] == val]
+        elif op == "<=": df = df[df[field] <= val]
+        elif op == ">=": df = df[df[field] >= val]
+
+    if df.empty:
+        return []
+
+    # ✅ DYNAMIC OUTPUT LOGIC
+    # If symbols are provided, we are on the StockDetail page and need ALL rows for the chart
+    if history:
+        history_records = df.to_dict('records')
+        for record in history_records:
+            record["symbol"] = symbol
+            if date_col in record:
+                # Format date for frontend JS compatibility
+                record[date_col] = record[date_col].strftime('%Y-%m-%d')
+        return history_records
+
+    # DASHBOARD MODE: Return only the final aggregated row
+    latest = df.iloc[-1].to_dict()
+    latest["symbol"] = symbol
+
+    # Numeric cleanup for JSON stability
+    latest["close"] = float(latest.get("close", 0)) if pd.notna(latest.get("close")) else 0.0
+    latest["volume"] = int(latest.get("volume", 0)) if pd.notna(latest.get("volume")) else 0
+    if date_col in latest:
+        latest[date_col] = latest[date_col].strftime('%Y-%m-%d')
+
+    if latest["close"] > 0:
+        return [latest]
+    return []
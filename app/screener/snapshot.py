@@ -0,0 +1,61 @@
+"""
+Materialized latest-row snapshot: one dashboard row per symbol.
+
+Rows are cached per loaded frame, so when a CSV is uploaded only that
+symbol's row is rebuilt. Unfiltered dashboard screens and their intent
+orderings are served from here without touching the history data.
+"""
+import threading
+
+from app.screener import store
+from app.screener.engine import clean_latest
+from app.screener.ranking import rank_records
+
+_snapshot = {"version": None, "rows": {}, "records": None}
+_lock = threading.Lock()
+
+
+class SnapshotRecords(list):
+    """Snapshot rows in file order, with per-intent orderings cached."""
+
+    def __init__(self, records):
+        super().__init__(records)
+        self._ranked = {}
+
+    def ranked(self, intent):
+        if intent not in self._ranked:
+            self._ranked[intent] = rank_records(list(self), intent)
+        return self._ranked[intent]
+
+
+def latest_row(symbol, df, date_col=None):
+    """Dashboard row for one frame (None when it has no positive close)."""
+    if df.empty:
+        return None
+
+    latest = df.iloc[[-1]].copy()
+    latest["symbol"] = symbol
+    keep = clean_latest(latest, date_col)
+    return latest[keep].to_dict('records')[0] if keep[0] else None
+
+
+def latest_records():
+    """
+    One latest row per valid symbol, in file order.
+    Only frames that were (re)loaded since the last call are recomputed.
+    """
+    version = store.sync()
+
+    with _lock:
+        if _snapshot["version"] == version:
+            return _snapshot["records"]
+
+        # id(df) is stable here because each entry keeps its frame alive
+        previous, rows = _snapshot["rows"], {}
+        for symbol, df, date_col in store.iter_universe():
+            key = (symbol, id(df))
+            rows[key] = previous[key] if key in previous else (df, latest_row(symbol, df, date_col))
+
+        records = SnapshotRecords(row for _, row in rows.values() if row is not None)
+        _snapshot.update(version=version, rows=rows, records=records)
+    return records
@@ -0,0 +1,231 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import pandas as pd
+
+from app.config import UPLOAD_DIR, STORE_LOAD_WORKERS
+from app.screener import catalog, columnar
+from app.screener.catalog import symbol_from_filename, INVALID_SYMBOLS
+
+NUMERIC_COLS = ["open", "high", "low", "close", "volume", "vwap", "turnover", "trades", "%deliverble"]
+
+# filename -> {"mtime", "size", "df", "date_col"}
+_frames = {}
+_state = {"version": 0, "catalog_version": None}
+_lock = threading.Lock()
+
+
+def find_date_col(df):
+    return next((c for c in df.columns if c.lower() == "date"), None)
+
+
+def normalize_frame(df):
+    """
+    Coerce numeric columns, parse dates and sort by date.
+    Returns (df, date_col); date_col is None when the frame has no date column.
+    """
+    if df.empty:
+        return df, None
+
+    # 🔒 Numeric normalization
+    for col in NUMERIC_COLS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    # 📅 Date parsing
+    date_col = find_date_col(df)
+    if date_col:
+        df[date_col] = pd.to_datetime(df[date_col], errors="coerce", dayfirst=True, format='mixed')
+        df = df.dropna(subset=[date_col])
+        df = df.sort_values(date_col)
+
+    return df, date_col
+
+
+def parse_csv(path):
+    """Read one symbol CSV into a typed frame sorted by date."""
+    return normalize_frame(pd.read_csv(path))
+
+
+def load_frame(filename, directory=None):
+    """Prefer the binary sidecar written at upload time; fall back to the CSV."""
+    directory = directory or UPLOAD_DIR
+    path = os.path.join(directory, filename)
+
+    if directory == UPLOAD_DIR:
+        df = columnar.read(filename, os.stat(path).st_mtime_ns)
+        if df is not None:
+            return df, find_date_col(df)
+    return parse_csv(path)
+
+
+def _load_shard(directory, filenames):
+    """Worker side of load_many: [(filename, mtime, size, df, date_col)]."""
+    loaded = []
+    for filename in filenames:
+        try:
+            st = os.stat(os.path.join(directory, filename))
+            loaded.append((filename, st.st_mtime_ns, st.st_size, *load_frame(filename, directory)))
+        except Exception as e:
+            print(f"[SKIPPED LOAD] {filename}: {e}")
+    return loaded
+
+
+def load_many(filenames, workers=None, directory=None):
+    """
+    Load many files, sharded across a process pool when workers > 1.
+    Frames come back pickled (protocol 5 keeps the column buffers contiguous).
+    """
+    workers = STORE_LOAD_WORKERS if workers is None else workers
+    directory = directory or UPLOAD_DIR
+
+    if workers <= 1 or len(filenames) < 2:
+        return _load_shard(directory, filenames)
+
+    # small interleaved shards keep the workers evenly busy
+    n_shards = min(len(filenames), workers * 4)
+    shards = [filenames[i::n_shards] for i in range(n_shards)]
+
+    # never fork the app process: it runs threads (upload jobs, OTP purge,
+    # email worker) whose locks a forked child could inherit held
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+    loaded = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method)) as pool:
+        for part in pool.map(_load_shard, repeat(directory), shards):
+            loaded.extend(part)
+    return loaded
+
+
+def warm(workers=None):
+    """
+    Load every stale or missing file in one batch (in parallel when
+    STORE_LOAD_WORKERS > 1) and print how long the cold load took.
+    """
+    workers = STORE_LOAD_WORKERS if workers is None else workers
+    stale = []
+    for filename in list_files():
+        known = catalog.get(filename)
+        if known is None:
+            continue
+        entry = _frames.get(filename)
+        if not entry or entry["mtime"] != known["mtime"] or entry["size"] != known["size"]:
+            stale.append(filename)
+
+    if not stale:
+        return 0
+
+    start = time.perf_counter()
+    loaded = load_many(stale, workers)
+
+    with _lock:
+        for filename, mtime, size, df, date_col in loaded:
+            _frames[filename] = {"mtime": mtime, "size": size, "df": df, "date_col": date_col}
+        _state["version"] += 1
+
+    print(f"[STORE] loaded {len(loaded)} file(s) in {time.perf_counter() - start:.2f}s "
+          f"({'serial' if workers <= 1 else f'{workers} workers'})")
+    return len(loaded)
+
+
+def list_files():
+    """
+    CSV filenames in the upload directory, sorted, from the catalog
+    (no directory listing). The same list object until an upload lands.
+    """
+    return catalog.files()
+
+
+def get_frame(filename):
+    """
+    Parsed (df, date_col) for one uploaded file, or None if it is gone.
+    Frames are shared between requests: callers must not mutate them in place.
+    """
+    known = catalog.get(filename)
+    if known is None:
+        invalidate(filename)
+        return None
+
+    with _lock:
+        entry = _frames.get(filename)
+        if entry and entry["mtime"] == known["mtime"] and entry["size"] == known["size"]:
+            return entry["df"], entry["date_col"]
+
+    try:
+        df, date_col = load_frame(filename)
+    except FileNotFoundError:
+        return None
+
+    with _lock:
+        _frames[filename] = {
+            "mtime": known["mtime"],
+            "size": known["size"],
+            "df": df,
+            "date_col": date_col,
+        }
+        _state["version"] += 1
+    return df, date_col
+
+
+def iter_entries(symbols=None):
+    """
+    Yield (filename, symbol, df, date_col) for every valid uploaded symbol,
+    in file order. `symbols` (upper-case) restricts the scan to those symbols.
+    """
+    for file in list_files():
+        symbol = symbol_from_filename(file)
+
+        if not symbol or symbol in INVALID_SYMBOLS:
+            continue
+
+        if symbols and symbol not in symbols:
+            continue
+
+        frame = get_frame(file)
+        if frame is None:
+            continue
+
+        yield (file, symbol, *frame)
+
+
+def iter_universe(symbols=None):
+    """Yield (symbol, df, date_col) for every valid uploaded symbol, in file order."""
+    for _, symbol, df, date_col in iter_entries(symbols):
+        yield symbol, df, date_col
+
+
+def version():
+    """Bumped whenever a cached frame is (re)loaded or invalidated."""
+    return _state["version"]
+
+
+def sync():
+    """
+    Bring every cached frame up to date and return the store version.
+    Only does work when the catalog version moved (an upload, or a manifest
+    change from another process), so it is cheap to call per request.
+    """
+    catalog_version = catalog.version()
+    if catalog_version == _state["catalog_version"]:
+        return _state["version"]
+
+    warm()
+    for _ in iter_universe():
+        pass
+
+    _state["catalog_version"] = catalog_version
+    return _state["version"]
+
+
+def invalidate(filename=None):
+    """Drop one cached file (or everything) so the next read re-parses it."""
+    with _lock:
+        if filename is None:
+            _frames.clear()
+        else:
+            _frames.pop(filename, None)
+        _state["version"] += 1
+        _state["catalog_version"] = None
@@ -0,0 +1,53 @@
+"""
+Universe-level aggregate behind the /analytics endpoints.
+
+One row per valid uploaded symbol (the catalog's universe) with last close, total volume, row count and
+date range, built in a single pass over the store and refreshed only when
+the store version moves (i.e. after uploads). Per-file rows are reused
+for frames that did not change.
+"""
+import threading
+import pandas as pd
+
+from app.screener import store
+from app.screener.store import symbol_from_filename
+
+COLUMNS = ["file", "symbol", "last_close", "total_volume", "rows", "first_date", "last_date"]
+
+_summary = {"version": None, "rows": {}, "table": pd.DataFrame(columns=COLUMNS)}
+_lock = threading.Lock()
+
+
+def summarize(filename, df, date_col):
+    """Aggregate row for one file; missing columns yield NaN fields."""
+    close = df["close"].dropna() if "close" in df.columns else pd.Series(dtype=float)
+    volume = df["volume"].dropna() if "volume" in df.columns else pd.Series(dtype=float)
+    dates = df[date_col] if date_col else pd.Series(dtype="datetime64[ns]")
+
+    return {
+        "file": filename,
+        "symbol": symbol_from_filename(filename),
+        "last_close": float(close.iloc[-1]) if not close.empty else float("nan"),
+        "total_volume": float(volume.sum()) if not volume.empty else float("nan"),
+        "rows": len(df),
+        "first_date": dates.iloc[0] if len(dates) else pd.NaT,
+        "last_date": dates.iloc[-1] if len(dates) else pd.NaT,
+    }
+
+
+def table():
+    """The aggregate as a DataFrame in file order (treat as read-only)."""
+    version = store.sync()
+
+    with _lock:
+        if _summary["version"] == version:
+            return _summary["table"]
+
+        previous, rows = _summary["rows"], {}
+        for filename, _, df, date_col in store.iter_entries():
+            key = (filename, id(df))
+            rows[key] = previous[key] if key in previous else (df, summarize(filename, df, date_col))
+
+        summary = pd.DataFrame([row for _, row in rows.values()], columns=COLUMNS)
+        _summary.update(version=version, rows=rows, table=summary)
+    return summary
@@ -0,0 +1,91 @@
+"""
+In-memory verification cache for gateway API keys.
+
+Valid and invalid lookups are both cached (separate TTLs), so neither
+legitimate traffic nor a client hammering with a bad key costs a DB round
+trip per request. Entries are keyed by a SHA-256 of the key and bounded
+by an LRU. revoke() deletes the key and drops its entry in this process;
+other workers notice within API_KEY_CACHE_TTL.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from app.config import API_KEY_CACHE_SIZE, API_KEY_CACHE_TTL, API_KEY_NEGATIVE_TTL
+from app.db import SessionLocal
+from app.models.api_key import APIKey
+
+# sha256(key) -> (valid, expires_at); most recently used last
+_entries = OrderedDict()
+_stats = {"hits": 0, "negative_hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+_lock = threading.Lock()
+
+
+def _digest(key):
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def lookup(key):
+    """The DB check the cache stands in front of."""
+    db = SessionLocal()
+    try:
+        return db.query(APIKey.id).filter_by(key=key).first() is not None
+    finally:
+        db.close()
+
+
+def is_valid(key):
+    digest = _digest(key)
+    now = time.monotonic()
+
+    with _lock:
+        entry = _entries.get(digest)
+        if entry and entry[1] > now:
+            _entries.move_to_end(digest)
+            _stats["hits" if entry[0] else "negative_hits"] += 1
+            return entry[0]
+        if entry:
+            _stats["expired"] += 1
+        _stats["misses"] += 1
+
+    valid = lookup(key)
+
+    with _lock:
+        ttl = API_KEY_CACHE_TTL if valid else API_KEY_NEGATIVE_TTL
+        _entries[digest] = (valid, time.monotonic() + ttl)
+        _entries.move_to_end(digest)
+        while len(_entries) > API_KEY_CACHE_SIZE:
+            _entries.popitem(last=False)
+            _stats["evictions"] += 1
+    return valid
+
+
+def invalidate(key=None):
+    """Forget one key (or every key) so the next request re-checks the DB."""
+    with _lock:
+        if key is None:
+            _entries.clear()
+        else:
+            _entries.pop(_digest(key), None)
+        _stats["invalidations"] += 1
+
+
+def revoke(key):
+    """Delete an API key and stop accepting it immediately. Returns True if it existed."""
+    db = SessionLocal()
+    try:
+        deleted = db.query(APIKey).filter_by(key=key).delete()
+        db.commit()
+    finally:
+        db.close()
+    invalidate(key)
+    return deleted > 0
+
+
+def stats():
+    with _lock:
+        result = dict(_stats, entries=len(_entries))
+    lookups = result["hits"] + result["negative_hits"] + result["misses"]
+    result["hit_rate"] = round((result["hits"] + result["negative_hits"]) / lookups, 4) if lookups else None
+    return result
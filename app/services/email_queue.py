@@ -0,0 +1,124 @@
+"""
+Background OTP email delivery.
+
+Auth routes only enqueue; one daemon worker drains the queue over a
+long-lived authenticated SMTP session, reconnecting when the server drops
+it and retrying each message with exponential backoff. The session is
+closed after EMAIL_IDLE_SECONDS without mail.
+"""
+import queue
+import smtplib
+import threading
+import time
+
+from app.config import (
+    FROM_EMAIL, EMAIL_QUEUE_LIMIT, EMAIL_RETRY_ATTEMPTS, EMAIL_RETRY_BASE_SECONDS,
+    EMAIL_IDLE_SECONDS
+)
+from app.services import emailer
+
+# recipient problems: retrying the same message cannot help
+PERMANENT_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused)
+
+_queue = queue.Queue(maxsize=EMAIL_QUEUE_LIMIT)
+_state = {"worker": None, "server": None}
+_stats = {"queued": 0, "sent": 0, "failed": 0, "retries": 0, "connects": 0, "dropped": 0}
+_lock = threading.Lock()
+
+
+class QueueFull(Exception):
+    pass
+
+
+def enqueue_otp(to_email, otp, minutes=10):
+    """Queue one OTP email; returns immediately. Raises QueueFull when backed up."""
+    _ensure_worker()
+    try:
+        _queue.put_nowait((to_email, emailer.build_otp_message(to_email, otp, minutes).as_string()))
+    except queue.Full:
+        with _lock:
+            _stats["dropped"] += 1
+        raise QueueFull(f"{EMAIL_QUEUE_LIMIT} emails already pending")
+    with _lock:
+        _stats["queued"] += 1
+
+
+def stats():
+    with _lock:
+        return dict(_stats, pending=_queue.qsize(), connected=_state["server"] is not None)
+
+
+def flush(timeout=None):
+    """Block until every queued email was sent or gave up (benchmarks / shutdown)."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while _queue.unfinished_tasks:
+        if deadline is not None and time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def _ensure_worker():
+    if _state["worker"] is None:
+        with _lock:
+            if _state["worker"] is None:
+                worker = threading.Thread(target=_run, name="email-queue", daemon=True)
+                worker.start()
+                _state["worker"] = worker
+
+
+def _close():
+    server, _state["server"] = _state["server"], None
+    if server is not None:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+
+def _send(to_email, message):
+    if _state["server"] is None:
+        _state["server"] = emailer.connect()
+        with _lock:
+            _stats["connects"] += 1
+    _state["server"].sendmail(FROM_EMAIL, [to_email], message)
+
+
+def _deliver(to_email, message):
+    for attempt in range(EMAIL_RETRY_ATTEMPTS):
+        try:
+            _send(to_email, message)
+            with _lock:
+                _stats["sent"] += 1
+            return
+        except PERMANENT_ERRORS as e:
+            print(f"[EMAIL REJECTED] {to_email}: {e}")
+            break
+        except (smtplib.SMTPException, OSError) as e:
+            # dropped / broken session: reconnect on the next try
+            _close()
+            if attempt + 1 < EMAIL_RETRY_ATTEMPTS:
+                with _lock:
+                    _stats["retries"] += 1
+                delay = min(EMAIL_RETRY_BASE_SECONDS * 2 ** attempt, 30)
+                print(f"[EMAIL RETRY] {to_email} in {delay:.1f}s: {e}")
+                time.sleep(delay)
+
+    with _lock:
+        _stats["failed"] += 1
+    print(f"[EMAIL FAILED] {to_email}")
+
+
+def _run():
+    while True:
+        try:
+            to_email, message = _queue.get(timeout=EMAIL_IDLE_SECONDS)
+        except queue.Empty:
+            _close()
+            continue
+        try:
+            _deliver(to_email, message)
+        except Exception as e:
+            print(f"[EMAIL WORKER ERROR] {to_email}: {e}")
+        finally:
+            _queue.task_done()
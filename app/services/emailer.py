@@ -1,20 +1,37 @@
 import smtplib
 from email.mime.text import MIMEText
-from app.config import SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASS, FROM_EMAIL
+from app.config import SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASS, FROM_EMAIL, SMTP_STARTTLS
 
-def send_otp_email(to_email: str, otp: str, minutes: int = 10):
+def build_otp_message(to_email: str, otp: str, minutes: int = 10):
     subject = "Your verification code"
     body = f"Your verification code is: {otp}\nIt will expire in {minutes} minutes.\n\nIf you didn't request this, please ignore."
     msg = MIMEText(body)
     msg["Subject"] = subject
     msg["From"] = FROM_EMAIL
     msg["To"] = to_email
+    return msg
+
 
-    # Use TLS
+def connect():
+    """Authenticated SMTP session (TLS when SMTP_STARTTLS)."""
     server = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=10)
     try:
-        server.starttls()
-        server.login(SMTP_USER, SMTP_PASS)
+        if SMTP_STARTTLS:
+            server.starttls()
+        if SMTP_USER:
+            server.login(SMTP_USER, SMTP_PASS)
+    except Exception:
+        server.close()
+        raise
+    return server
+
+
+def send_otp_email(to_email: str, otp: str, minutes: int = 10):
+    """One-off synchronous send on its own connection (the auth routes use email_queue)."""
+    msg = build_otp_message(to_email, otp, minutes)
+
+    server = connect()
+    try:
         server.sendmail(FROM_EMAIL, [to_email], msg.as_string())
     finally:
-        server.quit()
\ No newline at end of file
+        server.quit()
@@ -1,22 +1,115 @@
+import threading
 import requests
-from flask import request, Response
+from requests.adapters import HTTPAdapter
+from flask import request, Response, jsonify
+
+from app.config import (
+    GATEWAY_POOL_SIZE, GATEWAY_CONNECT_TIMEOUT, GATEWAY_READ_TIMEOUT, GATEWAY_CHUNK_BYTES
+)
+
+# RFC 7230 §6.1: meaningful for one connection only, never forwarded
+HOP_BY_HOP = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailer", "trailers", "transfer-encoding", "upgrade",
+}
+
+# 🔁 One pooled keep-alive session per upstream base URL
+_sessions = {}
+_lock = threading.Lock()
+
+
+def get_session(service_url):
+    session = _sessions.get(service_url)
+    if session is None:
+        with _lock:
+            session = _sessions.get(service_url)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=GATEWAY_POOL_SIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _sessions[service_url] = session
+    return session
+
+
+def strip_hop_by_hop(headers, extra=()):
+    """Drop hop-by-hop headers, including any the Connection header names."""
+    named = {
+        token.strip().lower()
+        for value in (v for k, v in headers if k.lower() == "connection")
+        for token in value.split(",")
+    }
+    drop = HOP_BY_HOP | named | set(extra)
+    return [(k, v) for k, v in headers if k.lower() not in drop]
+
+
+class _BodyStream:
+    """Incoming body with a known length: sent upstream in blocks, never buffered."""
+
+    def __init__(self, stream, length):
+        self.stream = stream
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def read(self, size=-1):
+        return self.stream.read(size)
+
+
+def _request_body():
+    if request.content_length:
+        return _BodyStream(request.stream, request.content_length)
+    if request.headers.get("Transfer-Encoding", "").lower() == "chunked":
+        # unknown length: re-chunk towards the upstream as it arrives
+        return iter(lambda: request.stream.read(GATEWAY_CHUNK_BYTES), b"")
+    return None
+
 
 def forward(service_url, path):
     url = f"{service_url}/{path}"
 
     # Correct header forwarding
-    headers = {
-        key: value
-        for key, value in request.headers.items()
-        if key.lower() != 'host'
-    }
+    headers = dict(strip_hop_by_hop(request.headers.items(), extra=("host",)))
+    forwarded_for = headers.get("X-Forwarded-For")
+    client = request.remote_addr or ""
+    headers["X-Forwarded-For"] = f"{forwarded_for}, {client}" if forwarded_for else client
+
+    try:
+        resp = get_session(service_url).request(
+            method=request.method,
+            url=url,
+            headers=headers,
+            params=request.args,
+            data=_request_body(),
+            stream=True,
+            allow_redirects=False,
+            timeout=(GATEWAY_CONNECT_TIMEOUT, GATEWAY_READ_TIMEOUT)
+        )
+    except requests.Timeout:
+        return jsonify({"error": "Upstream timed out"}), 504
+    except requests.ConnectionError as e:
+        return jsonify({"error": "Upstream unavailable", "details": str(e)}), 502
+
+    # 🌊 Stream the upstream body through as-is (still encoded, so Content-Length holds)
+    state = {"done": False}
+
+    def body():
+        yield from resp.raw.stream(GATEWAY_CHUNK_BYTES, decode_content=False)
+        state["done"] = True
 
-    resp = requests.request(
-        method=request.method,
-        url=url,
-        headers=headers,
-        params=request.args,
-        data=request.get_data()
-    )
+    def release():
+        # fully read: hand the keep-alive connection back to the pool; client
+        # went away, or the body was never iterated (HEAD, error before send):
+        # drop the connection instead
+        if state["done"]:
+            resp.raw.release_conn()
+        else:
+            resp.close()
 
-    return Response(resp.content, resp.status_code, resp.headers.items())
\ No newline at end of file
+    # no direct_passthrough: werkzeug only wraps the body in its closing
+    # iterator (which runs call_on_close) when it is not passed through
+    response = Response(body(), resp.status_code, strip_hop_by_hop(resp.raw.headers.items()))
+    # runs when the WSGI server closes the response, iterated or not
+    response.call_on_close(release)
+    return response
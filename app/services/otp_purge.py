@@ -0,0 +1,106 @@
+"""
+Purge of spent rows from email_otps.
+
+Used and expired OTPs are never read again once they leave the resend
+rate-limit window (one hour), so rows whose expiry is older than that are
+deleted in batches by a daemon thread every OTP_PURGE_INTERVAL_SECONDS.
+Rows inside the window are kept so /resend-otp can still count them.
+created_at is stamped by the database (server_default now()), so that
+window is measured on the database clock too (window_start).
+
+The thread only runs where OTP_PURGE_ON_START is set (one process is
+enough); otherwise schedule the CLI:
+
+    python -m app.services.otp_purge                  # one purge now
+    python -m app.services.otp_purge --create-indexes # add the model's indexes to an existing table
+"""
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select
+
+from app.config import OTP_PURGE_INTERVAL_SECONDS, OTP_PURGE_BATCH
+from app.db import SessionLocal
+from app.models.email_otp import EmailOTP
+
+RATE_LIMIT_WINDOW = timedelta(hours=1)
+
+_state = {"thread": None, "runs": 0, "deleted": 0, "last_run": None, "last_error": None}
+_lock = threading.Lock()
+
+
+def window_start(db):
+    """Start of the rate-limit window on the database clock, the one that stamps created_at."""
+    return db.execute(select(func.now())).scalar() - RATE_LIMIT_WINDOW
+
+
+def purge_expired(now=None):
+    """Delete OTPs that expired more than one rate-limit window ago; returns the row count."""
+    cutoff = (now or datetime.utcnow()) - RATE_LIMIT_WINDOW
+    deleted = 0
+
+    db = SessionLocal()
+    try:
+        while True:
+            ids = select(EmailOTP.id).where(EmailOTP.expires_at < cutoff).limit(OTP_PURGE_BATCH)
+            batch = db.execute(
+                delete(EmailOTP).where(EmailOTP.id.in_(ids.scalar_subquery())),
+                execution_options={"synchronize_session": False}
+            ).rowcount
+            db.commit()
+            deleted += batch
+            if batch < OTP_PURGE_BATCH:
+                break
+    finally:
+        db.close()
+
+    with _lock:
+        _state["runs"] += 1
+        _state["deleted"] += deleted
+        _state["last_run"] = datetime.utcnow().isoformat()
+    return deleted
+
+
+def _loop():
+    while True:
+        time.sleep(OTP_PURGE_INTERVAL_SECONDS)
+        try:
+            deleted = purge_expired()
+            if deleted:
+                print(f"[OTP PURGE] deleted {deleted} row(s)")
+        except Exception as e:
+            with _lock:
+                _state["last_error"] = str(e)
+            print(f"[OTP PURGE FAILED] {e}")
+
+
+def start():
+    """Start the background purge once per process (no-op when disabled)."""
+    if OTP_PURGE_INTERVAL_SECONDS <= 0:
+        return
+    with _lock:
+        if _state["thread"] is None:
+            _state["thread"] = threading.Thread(target=_loop, name="otp-purge", daemon=True)
+            _state["thread"].start()
+
+
+def stats():
+    with _lock:
+        return {k: v for k, v in _state.items() if k != "thread"}
+
+
+def create_indexes():
+    """CREATE INDEX for the model's indexes on a table created before they existed."""
+    bind = SessionLocal.kw["bind"]
+    for index in EmailOTP.__table__.indexes:
+        index.create(bind, checkfirst=True)
+
+
+if __name__ == "__main__":
+    if "--create-indexes" in sys.argv:
+        create_indexes()
+        print("[OTP PURGE] indexes ready")
+    else:
+        print(f"[OTP PURGE] deleted {purge_expired()} row(s)")
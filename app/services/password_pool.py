@@ -0,0 +1,77 @@
+"""
+Password hashing off the request threads.
+
+A bounded ThreadPoolExecutor runs the PBKDF2 / scrypt work (hashlib drops
+the GIL while hashing) and admission control caps queued + running hashes
+at HASH_QUEUE_LIMIT: past that, callers get Busy right away and the auth
+routes answer 503 instead of piling up behind a login burst.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from app.config import HASH_WORKERS, HASH_QUEUE_LIMIT, HASH_WAIT_SECONDS
+from app.utils import hash_utils
+
+_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="password-hash")
+_stats = {"inflight": 0, "completed": 0, "rejected": 0, "rehashed": 0}
+_lock = threading.Lock()
+
+# verified when the user does not exist, so unknown emails take as long as wrong passwords
+_DUMMY = {"hash": None}
+
+
+class Busy(Exception):
+    pass
+
+
+def _done(_future):
+    with _lock:
+        _stats["inflight"] -= 1
+        _stats["completed"] += 1
+
+
+def _run(fn, *args):
+    with _lock:
+        if _stats["inflight"] >= HASH_QUEUE_LIMIT:
+            _stats["rejected"] += 1
+            raise Busy(f"{_stats['inflight']} password hashes already pending")
+        _stats["inflight"] += 1
+
+    future = _executor.submit(fn, *args)
+    future.add_done_callback(_done)
+    try:
+        return future.result(timeout=HASH_WAIT_SECONDS)
+    except TimeoutError:
+        raise Busy(f"password hash not done within {HASH_WAIT_SECONDS}s")
+
+
+def _verify(stored, password):
+    if not hash_utils.verify_password(stored, password):
+        return False, None
+    if hash_utils.needs_rehash(stored):
+        with _lock:
+            _stats["rehashed"] += 1
+        return True, hash_utils.hash_password(password)
+    return True, None
+
+
+def hash_password(password):
+    return _run(hash_utils.hash_password, password)
+
+
+def verify_password(stored, password):
+    """
+    (ok, new_hash): new_hash is set when the password matched but the stored
+    hash uses an outdated scheme / cost; the caller should save it.
+    """
+    if stored is None:
+        if _DUMMY["hash"] is None:
+            _DUMMY["hash"] = _run(hash_utils.hash_password, "dummy-password")
+        _run(hash_utils.verify_password, _DUMMY["hash"], password)
+        return False, None
+    return _run(_verify, stored, password)
+
+
+def stats():
+    with _lock:
+        return dict(_stats)
@@ -1,7 +1,4 @@
-import os
-
-# Directory where uploaded CSVs are stored
-UPLOAD_DIR = "app/data/uploads"
+from app.services import symbol_index
 
 # Words that mean "all stocks", not a specific company
 GENERIC_KEYWORDS = {"stocks", "stock", "market", "nse", "shares", "all"}
@@ -13,20 +10,12 @@ def resolve_symbols(parsed_query: dict):
     Example:
     cleaned_AXISBANK.csv  → AXISBANK
     cleaned_ADANIPORTS.csv → ADANIPORTS
-    """
-
-    if not os.path.exists(UPLOAD_DIR):
-        return []
 
-    # 1️⃣ Extract symbols from filenames
-    files = os.listdir(UPLOAD_DIR)
-    symbols = [
-        f.replace("cleaned_", "").replace(".csv", "")
-        for f in files
-        if f.endswith(".csv")
-    ]
+    Results are ranked best match first (exact, alias, prefix,
+    substring, then one-typo fuzzy matches) and deterministic.
+    """
 
-    # 2️⃣ Get keywords from parsed query
+    # 1️⃣ Get keywords from parsed query
     raw_keywords = parsed_query.get("keywords", [])
 
     # Remove generic words like "stocks", "market"
@@ -35,17 +24,9 @@ def resolve_symbols(parsed_query: dict):
         if k.lower() not in GENERIC_KEYWORDS
     ]
 
-    # 3️⃣ If no meaningful keywords → return ALL symbols
+    # 2️⃣ If no meaningful keywords → return ALL symbols
     if not keywords:
-        return symbols
-
-    # 4️⃣ Match keywords against symbols
-    matched = []
-    for sym in symbols:
-        sym_lower = sym.lower()
-        for kw in keywords:
-            if kw in sym_lower:
-                matched.append(sym)
-
-    # 5️⃣ Remove duplicates
-    return list(set(matched))
+        return list(symbol_index.current()["symbols"])
+
+    # 3️⃣ Indexed lookup (rebuilt only when the uploaded universe changes)
+    return [symbol for symbol, _, _ in symbol_index.resolve(keywords)]
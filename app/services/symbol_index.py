@@ -0,0 +1,223 @@
+"""
+In-memory symbol index for resolving query keywords to uploaded symbols.
+
+Built once per catalog listing (rebuilt only when the universe changes) and queried with dict / bisect lookups instead of a scan:
+
+    exact     keyword == symbol            ("wipro"      → WIPRO)
+    alias     company name → symbol        ("infosys"    → INFY)
+    prefix    sorted keys + bisect         ("bajaj"      → BAJAJ-AUTO, BAJAJFINSV)
+    substring trigram postings, verified   ("paint"      → ASIANPAINT)
+    fuzzy     1-deletion neighbourhoods    ("wirpo"      → WIPRO)
+
+Matching runs on normalized keys (lower-case, alphanumerics only), so
+"bajaj auto" and "bajaj-auto" both reach BAJAJ-AUTO.
+"""
+import bisect
+import json
+import re
+import threading
+from difflib import SequenceMatcher
+
+from app.config import SYMBOL_ALIASES_PATH
+from app.screener import catalog
+
+# Common company names; only aliases whose symbol is uploaded are indexed.
+# SYMBOL_ALIASES_PATH (JSON {"name": "SYMBOL"}) adds to / overrides these.
+DEFAULT_ALIASES = {
+    "infosys": "INFY",
+    "airtel": "BHARTIARTL",
+    "bharti airtel": "BHARTIARTL",
+    "asian paints": "ASIANPAINT",
+    "adani ports": "ADANIPORTS",
+    "axis": "AXISBANK",
+    "axis bank": "AXISBANK",
+    "zee": "ZEEL",
+    "zee entertainment": "ZEEL",
+    "bajaj finserv": "BAJAJFINSV",
+    "bajaj finance": "BAJFINANCE",
+    "maruti": "MARUTI",
+    "maruti suzuki": "MARUTI",
+    "reliance": "RELIANCE",
+    "reliance industries": "RELIANCE",
+    "tata motors": "TATAMOTORS",
+    "tata steel": "TATASTEEL",
+    "tata consultancy": "TCS",
+    "hdfc bank": "HDFCBANK",
+    "icici bank": "ICICIBANK",
+    "state bank": "SBIN",
+    "sbi": "SBIN",
+    "hindustan unilever": "HINDUNILVR",
+    "larsen": "LT",
+    "mahindra": "M&M",
+    "sun pharma": "SUNPHARMA",
+    "dr reddy": "DRREDDY",
+    "power grid": "POWERGRID",
+    "ultratech": "ULTRACEMCO",
+}
+
+SCORES = {"exact": 100, "alias": 95, "prefix": 80, "substring": 60, "fuzzy": 40}
+FUZZY_MIN_LEN = 4
+FUZZY_MIN_RATIO = 0.75
+
+_index = {"files": None}
+_lock = threading.Lock()
+
+
+def normalize(text):
+    return re.sub(r"[^a-z0-9]", "", text.lower())
+
+
+def _deletions(key):
+    return {key[:i] + key[i + 1:] for i in range(len(key))} | {key}
+
+
+def _trigrams(key):
+    return {key[i:i + 3] for i in range(len(key) - 2)}
+
+
+def load_aliases(symbols):
+    aliases = dict(DEFAULT_ALIASES)
+    if SYMBOL_ALIASES_PATH:
+        try:
+            with open(SYMBOL_ALIASES_PATH) as fh:
+                aliases.update(json.load(fh))
+        except (FileNotFoundError, ValueError):
+            pass
+
+    known = set(symbols)
+    return {normalize(name): symbol for name, symbol in aliases.items() if symbol in known}
+
+
+def build(symbols):
+    """Index for a list of symbols (deterministic: symbols are sorted first)."""
+    symbols = sorted(set(symbols))
+    by_key, trigrams, nearby = {}, {}, {}
+
+    for symbol in symbols:
+        key = normalize(symbol)
+        by_key.setdefault(key, []).append(symbol)
+        for gram in _trigrams(key):
+            trigrams.setdefault(gram, set()).add(key)
+        if len(key) >= FUZZY_MIN_LEN:
+            for variant in _deletions(key):
+                nearby.setdefault(variant, set()).add(key)
+
+    aliases = load_aliases(symbols)
+    for name in aliases:
+        if len(name) >= FUZZY_MIN_LEN:
+            for variant in _deletions(name):
+                nearby.setdefault(variant, set()).add(name)
+
+    return {
+        "symbols": symbols,
+        "by_key": by_key,
+        "sorted_keys": sorted(by_key),
+        "trigrams": trigrams,
+        "nearby": nearby,
+        "aliases": aliases,
+    }
+
+
+def current():
+    """Index over the catalog's universe, rebuilt only when the catalog changes."""
+    files = catalog.files()
+    with _lock:
+        if _index["files"] is files:
+            return _index
+
+    index = build(entry["symbol"] for entry in catalog.universe())
+
+    with _lock:
+        _index.clear()
+        _index.update(index, files=files)
+        return _index
+
+
+def _symbols_for(index, key):
+    """Symbols a normalized key stands for (a symbol key or an alias)."""
+    if key in index["by_key"]:
+        return index["by_key"][key]
+    if key in index["aliases"]:
+        return [index["aliases"][key]]
+    return []
+
+
+def lookup(index, keyword):
+    """
+    Ranked [(symbol, score, kind)] for one keyword: the best kind that
+    matches wins; ties are broken by closeness of length, then symbol.
+    """
+    key = normalize(keyword)
+    if not key:
+        return []
+
+    if key in index["by_key"]:
+        return [(s, SCORES["exact"], "exact") for s in index["by_key"][key]]
+    if key in index["aliases"]:
+        return [(index["aliases"][key], SCORES["alias"], "alias")]
+
+    found = {}
+
+    # prefix: contiguous run of the sorted keys
+    keys = index["sorted_keys"]
+    start = bisect.bisect_left(keys, key)
+    for candidate in keys[start:bisect.bisect_left(keys, key + "\x7f")]:
+        found[candidate] = (SCORES["prefix"] - (len(candidate) - len(key)), "prefix")
+
+    # substring (the resolver's original "kw in symbol" rule), via trigram postings
+    if len(key) >= 3:
+        postings = [index["trigrams"].get(gram, set()) for gram in _trigrams(key)]
+        for candidate in set.intersection(*postings) if all(postings) else ():
+            if candidate not in found and key in candidate:
+                found[candidate] = (SCORES["substring"] - (len(candidate) - len(key)), "substring")
+
+    # fuzzy: one typo (insert / delete / substitute / swap) via shared deletions
+    if not found and len(key) >= FUZZY_MIN_LEN:
+        for variant in _deletions(key):
+            for candidate in index["nearby"].get(variant, ()):
+                ratio = SequenceMatcher(None, key, candidate).ratio()
+                if ratio >= FUZZY_MIN_RATIO:
+                    score = round(SCORES["fuzzy"] * ratio, 2)
+                    if score > found.get(candidate, (0,))[0]:
+                        found[candidate] = (score, "fuzzy")
+
+    results = {}
+    for candidate, (score, kind) in found.items():
+        for symbol in _symbols_for(index, candidate):
+            if score > results.get(symbol, (0,))[0]:
+                results[symbol] = (score, kind)
+
+    return sorted(
+        ((symbol, score, kind) for symbol, (score, kind) in results.items()),
+        key=lambda item: (-item[1], item[0])
+    )
+
+
+def resolve(keywords):
+    """
+    Ranked [(symbol, score, kind)] for a keyword list. Adjacent keywords are
+    also tried joined ("tata", "motors" → "tatamotors"); a joined match
+    replaces the matches of its parts.
+    """
+    index = current()
+    keywords = [k for k in keywords if normalize(k)]
+
+    results, used = {}, set()
+    for i in range(len(keywords) - 1):
+        joined = keywords[i] + keywords[i + 1]
+        hits = [h for h in lookup(index, joined) if h[2] in ("exact", "alias")]
+        if hits:
+            used.update((i, i + 1))
+            for symbol, score, kind in hits:
+                results[symbol] = max(results.get(symbol, (0, kind)), (score, kind))
+
+    for i, keyword in enumerate(keywords):
+        if i in used:
+            continue
+        for symbol, score, kind in lookup(index, keyword):
+            results[symbol] = max(results.get(symbol, (0, kind)), (score, kind))
+
+    return sorted(
+        ((symbol, score, kind) for symbol, (score, kind) in results.items()),
+        key=lambda item: (-item[1], item[0])
+    )
@@ -0,0 +1,120 @@
+"""
+Background embedding/indexing jobs for /upload-csv.
+
+A local, in-process queue: a bounded ThreadPoolExecutor runs the jobs and
+a dict keeps their progress for /upload-jobs/<id>. No external broker.
+"""
+import threading
+import time
+import uuid
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import (
+    UPLOAD_JOB_WORKERS, UPLOAD_JOB_QUEUE_LIMIT, UPLOAD_JOB_BATCH_ROWS, UPLOAD_JOB_HISTORY
+)
+from app.embeddings.embedder import generate_embeddings
+from app.embeddings.vector_db import store_embeddings
+from app.embeddings import related_index
+from app.screener.store import symbol_from_filename, INVALID_SYMBOLS
+
+_executor = ThreadPoolExecutor(max_workers=UPLOAD_JOB_WORKERS, thread_name_prefix="upload-job")
+_jobs = {}
+_lock = threading.Lock()
+
+
+class QueueFull(Exception):
+    pass
+
+
+def reserve(filename, rows_total):
+    """
+    Take a queue slot for an upload before anything is written; the job
+    stays "queued" until start(). Raises QueueFull when the queue is full.
+    """
+    with _lock:
+        active = sum(1 for j in _jobs.values() if j["status"] in ("queued", "running"))
+        if active >= UPLOAD_JOB_QUEUE_LIMIT:
+            raise QueueFull(f"{active} upload jobs already pending")
+
+        job = {
+            "id": uuid.uuid4().hex,
+            "file": filename,
+            "status": "queued",
+            "rows_total": rows_total,
+            "rows_done": 0,
+            "rows_per_sec": None,
+            "error": None,
+            "queued_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        _jobs[job["id"]] = job
+        _prune()
+        return dict(job)
+
+
+def start(job_id, df):
+    """Run a reserved job's embedding + indexing in the pool."""
+    with _lock:
+        filename = _jobs[job_id]["file"]
+    _executor.submit(_run, job_id, filename, df)
+    return get(job_id)
+
+
+def release(job_id, error):
+    """Give a reserved slot back when the upload failed before start()."""
+    _update(job_id, status="failed", error=error, finished_at=time.time())
+
+
+def submit(filename, df):
+    """Queue embedding + indexing of an uploaded frame; returns the job dict."""
+    job = reserve(filename, len(df))
+    return start(job["id"], df)
+
+
+def get(job_id):
+    with _lock:
+        job = _jobs.get(job_id)
+        return dict(job) if job else None
+
+
+def _update(job_id, **fields):
+    with _lock:
+        _jobs[job_id].update(fields)
+
+
+def _prune():
+    finished = [j for j in _jobs.values() if j["status"] in ("done", "failed")]
+    for job in sorted(finished, key=lambda j: j["finished_at"])[:-UPLOAD_JOB_HISTORY or None]:
+        del _jobs[job["id"]]
+
+
+def _run(job_id, filename, df):
+    started = time.time()
+    _update(job_id, status="running", started_at=started)
+
+    try:
+        records = df.to_dict(orient="records")
+        total = None
+        for start in range(0, len(records), UPLOAD_JOB_BATCH_ROWS):
+            batch = records[start:start + UPLOAD_JOB_BATCH_ROWS]
+            embeddings = generate_embeddings(batch)
+            store_embeddings(embeddings, batch)
+
+            batch_sum = np.sum(embeddings, axis=0)
+            total = batch_sum if total is None else total + batch_sum
+
+            done = start + len(batch)
+            elapsed = max(time.time() - started, 1e-9)
+            _update(job_id, rows_done=done, rows_per_sec=round(done / elapsed, 1))
+
+        # 🧭 Symbol centroid for related_stocks: one row updated in place
+        symbol = symbol_from_filename(filename)
+        if total is not None and symbol not in INVALID_SYMBOLS:
+            related_index.upsert(symbol, total / len(records))
+
+        _update(job_id, status="done", finished_at=time.time())
+    except Exception as e:
+        print(f"[UPLOAD JOB FAILED] {job_id}: {e}")
+        _update(job_id, status="failed", error=str(e), finished_at=time.time())
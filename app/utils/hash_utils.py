@@ -1,43 +1,71 @@
 import hashlib
+import hmac
 import os
 import binascii
 
+from app.config import PASSWORD_SCHEME, PBKDF2_ITERATIONS, SCRYPT_N, SCRYPT_R, SCRYPT_P
+
+# Stored formats:
+#   pbkdf2_sha256$<iterations>$<salt>$<hash>
+#   scrypt$<n>$<r>$<p>$<salt>$<hash>
+#   <64 hex salt><64 hex hash>        legacy: PBKDF2-SHA256, 100k iterations
+LEGACY_ITERATIONS = 100000
+
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt.encode("ascii"), iterations)
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(
+        password.encode("utf-8"), salt=salt.encode("ascii"), n=n, r=r, p=p,
+        maxmem=256 * n * r + 1024 * 1024
+    )
+
 
 def hash_password(password: str) -> str:
     """
-    Hash a password using PBKDF2-HMAC-SHA256 with a random salt.
+    Hash a password with the configured scheme and cost and a random salt.
     """
-    salt = hashlib.sha256(os.urandom(60)).hexdigest().encode("ascii")
+    salt = binascii.hexlify(os.urandom(16)).decode("ascii")
 
-    pwdhash = hashlib.pbkdf2_hmac(
-        "sha256",
-        password.encode("utf-8"),
-        salt,
-        100000
-    )
-
-    pwdhash = binascii.hexlify(pwdhash)
+    if PASSWORD_SCHEME == "scrypt":
+        digest = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+        return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt}${digest.hex()}"
 
-    # store salt + hash together
-    return (salt + pwdhash).decode("ascii")
+    digest = _pbkdf2(password, salt, PBKDF2_ITERATIONS)
+    return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${salt}${digest.hex()}"
 
 
 def verify_password(stored_password: str, provided_password: str) -> bool:
     """
-    Verify a stored password against a provided password.
+    Verify a stored password (any supported format) in constant time.
     """
-    # extract salt and hash
-    salt = stored_password[:64]
-    stored_hash = stored_password[64:]
-
-    pwdhash = hashlib.pbkdf2_hmac(
-        "sha256",
-        provided_password.encode("utf-8"),
-        salt.encode("ascii"),
-        100000
-    )
+    parts = stored_password.split("$")
+    try:
+        if parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+            _, iterations, salt, stored_hash = parts
+            digest = _pbkdf2(provided_password, salt, int(iterations))
+        elif parts[0] == "scrypt" and len(parts) == 6:
+            _, n, r, p, salt, stored_hash = parts
+            digest = _scrypt(provided_password, salt, int(n), int(r), int(p))
+        elif len(parts) == 1:
+            salt, stored_hash = stored_password[:64], stored_password[64:]
+            digest = _pbkdf2(provided_password, salt, LEGACY_ITERATIONS)
+        else:
+            return False
+    except (ValueError, UnicodeEncodeError):
+        return False
 
-    pwdhash = binascii.hexlify(pwdhash).decode("ascii")
+    return hmac.compare_digest(digest.hex(), stored_hash)
 
-    # 🔥 THIS RETURN WAS MISSING IN YOUR CODE
-    return pwdhash == stored_hash
+
+def needs_rehash(stored_password: str) -> bool:
+    """
+    True when a hash was made with another scheme or cost than configured
+    (legacy hashes always), so it should be replaced after a good login.
+    """
+    parts = stored_password.split("$")
+    if PASSWORD_SCHEME == "scrypt":
+        return parts[:4] != ["scrypt", str(SCRYPT_N), str(SCRYPT_R), str(SCRYPT_P)]
+    return parts[:2] != ["pbkdf2_sha256", str(PBKDF2_ITERATIONS)]
@@ -0,0 +1,46 @@
+"""
+Explicit warm-up for the lazily loaded resources.
+
+Nothing heavy is loaded at import time; call warm_up() (or set
+WARM_UP_ON_START) in a long-lived worker to pay for it before the first
+request instead of during it.
+
+    python -m app.warmup
+"""
+import time
+
+RESOURCES = ("embedding_model", "embedding_cache", "gemini_client", "screener_store")
+
+
+def _load(name):
+    if name == "embedding_model":
+        from app.embeddings.embedder import get_model
+        get_model()
+    elif name == "embedding_cache":
+        from app.embeddings.embedder import get_cache
+        get_cache()
+    elif name == "gemini_client":
+        from app.llm.parser import get_client
+        get_client()
+    elif name == "screener_store":
+        from app.screener import store
+        store.sync()
+
+
+def warm_up(resources=RESOURCES):
+    """Load each resource once; returns {name: seconds}. Failures are logged, not raised."""
+    timings = {}
+    for name in resources:
+        start = time.perf_counter()
+        try:
+            _load(name)
+        except Exception as e:
+            print(f"[WARM-UP FAILED] {name}: {e}")
+            continue
+        timings[name] = round(time.perf_counter() - start, 3)
+        print(f"[WARM-UP] {name} ready in {timings[name]}s")
+    return timings
+
+
+if __name__ == "__main__":
+    warm_up()
@@ -0,0 +1,109 @@
+"""
+/chat streaming: NDJSON output must match the buffered JSON response, plus timings.
+
+    python -m benchmarks.bench_chat_stream [--symbols 500] [--days 250] [--repeat 5]
+
+A synthetic universe is generated and served through create_app()'s test
+client (Gemini and the embedder are the fakes from benchmarks.fakes). For
+dashboard queries (the latest-row snapshot, the filtered panel and the
+quarterly rollups), the `stream: true` response is checked against the
+non-streamed one:
+- the header carries the same message, count and total_universe;
+- every record line is byte for byte the app's JSON encoding of the
+  matching buffered record (NaN as null), in the same order;
+- dates are "YYYY-MM-DD" strings in both.
+Then the time to the full buffered body and to the first NDJSON line is
+printed for each query.
+"""
+import argparse
+import json
+import math
+import re
+import statistics
+import tempfile
+import time
+
+from benchmarks import fakes
+from benchmarks.synthetic import write_csv_universe
+
+QUERIES = [
+    "show me all stocks",
+    "top 20 stocks by volume",
+    "stocks with close above 500",
+    "top 10 stocks by volume last 4 quarters",
+]
+
+HEADER_FIELDS = ["message", "query", "intent", "quarters", "timeframe", "count", "total_universe"]
+
+
+def without_nan(record):
+    return {k: (None if isinstance(v, float) and math.isnan(v) else v) for k, v in record.items()}
+
+
+def check(app, client, query):
+    buffered = client.post("/chat", json={"query": query})
+    assert buffered.status_code == 200, buffered.status_code
+    expected = buffered.get_json()
+
+    streamed = client.post("/chat", json={"query": query, "stream": True})
+    assert streamed.mimetype == "application/x-ndjson", streamed.mimetype
+    header, *lines = streamed.get_data(as_text=True).splitlines()
+
+    header = json.loads(header)
+    for field in HEADER_FIELDS:
+        assert header[field] == expected[field], (query, field, header[field], expected[field])
+    assert len(lines) == len(expected["data"]) == header["count"], (query, len(lines), len(expected["data"]))
+
+    with app.app_context():
+        for line, record in zip(lines, expected["data"]):
+            assert line == app.json.dumps(without_nan(record)), (query, line)
+            date = json.loads(line).get("date")
+            assert isinstance(date, str) and re.fullmatch(r"\d{4}-\d{2}-\d{2}", date), (query, date)
+    return len(lines)
+
+
+def median_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def first_line(client, query):
+    response = client.post("/chat", json={"query": query, "stream": True}, buffered=False)
+    next(iter(response.response))
+    response.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--days", type=int, default=250)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    fakes.install()
+    from app import create_app
+    from benchmarks.suite import use_upload_dir
+
+    app = create_app()
+    client = app.test_client()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_csv_universe(tmp, args.symbols, args.days)
+        use_upload_dir(tmp)
+
+        print(f"{'query':<40} {'rows':>6} {'buffered ms':>12} {'first line ms':>14}")
+        for query in QUERIES:
+            rows = check(app, client, query)
+            full = median_ms(lambda: client.post("/chat", json={"query": query}), args.repeat)
+            first = median_ms(lambda: first_line(client, query), args.repeat)
+            print(f"{query:<40} {rows:>6} {full:>12.1f} {first:>14.1f}")
+
+    print("\nstreamed records match the buffered response")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Serial vs process-pool cold load of an upload directory.
+
+    python -m benchmarks.bench_cold_load [--symbols 500] [--days 1250] [--workers 1 2 4 8]
+    python -m benchmarks.bench_cold_load --dir app/data/uploads
+
+Without --dir a synthetic CSV universe is written to a temp directory.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from app.screener import store
+from benchmarks.synthetic import write_csv_universe
+
+
+def run(directory, workers_list):
+    filenames = sorted(f for f in os.listdir(directory) if f.endswith(".csv"))
+    rows = None
+    print(f"{len(filenames)} file(s) in {directory}")
+    print(f"{'workers':>8} {'seconds':>9} {'files/s':>9} {'speedup':>8}")
+
+    baseline = None
+    for workers in workers_list:
+        start = time.perf_counter()
+        loaded = store.load_many(filenames, workers=workers, directory=directory)
+        elapsed = time.perf_counter() - start
+
+        total = sum(len(item[3]) for item in loaded)
+        assert rows is None or rows == total, "serial/parallel row counts differ"
+        rows = total
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>9.2f} {len(loaded) / elapsed:>9.1f} {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dir", default=None)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--days", type=int, default=1250)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    if args.dir:
+        run(args.dir, args.workers)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            write_csv_universe(tmp, args.symbols, args.days)
+            run(tmp, args.workers)
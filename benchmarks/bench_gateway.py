@@ -0,0 +1,210 @@
+"""
+Gateway forwarder load test against a local stub upstream.
+
+    python -m benchmarks.bench_gateway [--requests 2000] [--clients 8] [--small-kb 4] [--large-mb 32]
+                                       [--handshake-ms 5]
+
+A keep-alive HTTP/1.1 stub upstream and a minimal Flask gateway (the real
+forward() vs the previous per-request requests.request version) run in
+this process on loopback ports. Loopback connects are nearly free, so the
+stub sleeps --handshake-ms on every new connection to stand in for the
+TCP/TLS setup of a real upstream. Throughput is measured with small
+responses, together with the upstream connections opened; memory is the
+tracemalloc peak while one large download and one large upload pass
+through the gateway. Afterwards the pooled forwarder is checked for
+leaked upstream connections after HEAD requests and after clients that
+hang up mid-download.
+"""
+import argparse
+import logging
+import socket
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from flask import Flask, Response, request
+from werkzeug.serving import make_server
+
+from app.services.forwarder import forward, get_session
+
+
+class Upstream(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    handshake = 0.0
+    connections = 0
+
+    def setup(self):
+        Upstream.connections += 1
+        time.sleep(self.handshake)
+        # like production servers: no Nagle delay between header and body writes
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        super().setup()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        size = int(self.path.rsplit("/", 1)[-1])
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(size))
+        self.end_headers()
+        block = b"x" * 65536
+        try:
+            while size > 0:
+                self.wfile.write(block[:size])
+                size -= len(block)
+        except (BrokenPipeError, ConnectionResetError):
+            # the gateway dropped the connection (its client hung up)
+            self.close_connection = True
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", self.path.rsplit("/", 1)[-1])
+        self.end_headers()
+
+    def do_POST(self):
+        remaining, total = int(self.headers.get("Content-Length", 0)), 0
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, 65536))
+            total += len(chunk)
+            remaining -= len(chunk)
+        body = str(total).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class Zeros:
+    """Upload body of `size` bytes produced on the fly (sent with Content-Length)."""
+
+    def __init__(self, size):
+        self.remaining = size
+
+    def __len__(self):
+        return self.remaining
+
+    def read(self, n=-1):
+        n = self.remaining if n < 0 else min(n, self.remaining)
+        self.remaining -= n
+        return b"\0" * n
+
+
+def legacy_forward(service_url, path):
+    """The previous forwarder: no session, no timeout, whole body buffered."""
+    headers = {k: v for k, v in request.headers.items() if k.lower() != 'host'}
+    resp = requests.request(method=request.method, url=f"{service_url}/{path}", headers=headers,
+                            params=request.args, data=request.get_data())
+    return Response(resp.content, resp.status_code, resp.headers.items())
+
+
+def serve(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def gateway(upstream_url, forwarder):
+    app = Flask("bench_gateway")
+
+    @app.route("/proxy/<path:path>", methods=["GET", "POST"])
+    def proxy(path):
+        return forwarder(upstream_url, path)
+
+    return serve(make_server("127.0.0.1", 0, app, threaded=True))
+
+
+def throughput(base, n, clients, size):
+    local = threading.local()
+
+    def call(_):
+        session = getattr(local, "session", None) or requests.Session()
+        local.session = session
+        r = session.get(f"{base}/proxy/payload/{size}")
+        assert r.status_code == 200 and len(r.content) == size
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        list(pool.map(call, range(n)))
+    return n / (time.perf_counter() - start)
+
+
+def peak_memory(base, size):
+    tracemalloc.start()
+    with requests.get(f"{base}/proxy/payload/{size}", stream=True) as r:
+        received = sum(len(chunk) for chunk in r.iter_content(65536))
+    down = tracemalloc.get_traced_memory()[1]
+    tracemalloc.reset_peak()
+
+    r = requests.post(f"{base}/proxy/echo", data=Zeros(size))
+    up = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert received == size and int(r.text) == size
+    return down, up
+
+
+def checked_out(upstream_url):
+    """Upstream connections the pooled forwarder has not handed back."""
+    pools = get_session(upstream_url).get_adapter(upstream_url).poolmanager.pools
+    return sum(pools[key].pool.maxsize - pools[key].pool.qsize() for key in pools.keys())
+
+
+def check_release(base, upstream_url, n=20, size=8 * 1024 * 1024):
+    """
+    HEAD requests, clients that hang up mid-body and responses closed before
+    their body was iterated must not leak pooled connections.
+    """
+    app, unsent = Flask("bench_gateway_close"), []
+    for _ in range(n):
+        with app.test_request_context(f"/proxy/payload/{size}"):
+            response = forward(upstream_url, f"payload/{size}")
+            response.close()        # what the WSGI server does after an error before send
+            unsent.append(response)  # kept alive: garbage collection must not be what frees it
+    for _ in range(n):
+        assert requests.head(f"{base}/proxy/payload/{size}").status_code == 200
+    for _ in range(n):
+        with requests.get(f"{base}/proxy/payload/{size}", stream=True) as r:
+            next(r.iter_content(65536))
+
+    deadline = time.monotonic() + 5
+    while checked_out(upstream_url) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    leaked = checked_out(upstream_url)
+    assert leaked == 0, f"{leaked} upstream connection(s) never returned or closed"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--small-kb", type=int, default=4)
+    parser.add_argument("--large-mb", type=int, default=32)
+    parser.add_argument("--handshake-ms", type=float, default=5)
+    args = parser.parse_args()
+    Upstream.handshake = args.handshake_ms / 1000
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    upstream = serve(ThreadingHTTPServer(("127.0.0.1", 0), Upstream))
+    upstream_url = f"http://127.0.0.1:{upstream.server_address[1]}"
+
+    print(f"{args.requests} x {args.small_kb}KB GETs from {args.clients} clients; "
+          f"{args.large_mb}MB download + upload for memory")
+    print(f"{'forwarder':>10} {'req/s':>8} {'upstream conns':>15} {'peak MB down':>13} {'peak MB up':>11}")
+    for name, forwarder in (("previous", legacy_forward), ("pooled", forward)):
+        server = gateway(upstream_url, forwarder)
+        base = f"http://127.0.0.1:{server.server_port}"
+        Upstream.connections = 0
+        rate = throughput(base, args.requests, args.clients, args.small_kb * 1024)
+        connections = Upstream.connections
+        down, up = peak_memory(base, args.large_mb * 1024 * 1024)
+        server.shutdown()
+        print(f"{name:>10} {rate:>8.0f} {connections:>15} {down / 2**20:>13.1f} {up / 2**20:>11.1f}")
+
+    server = gateway(upstream_url, forward)
+    check_release(f"http://127.0.0.1:{server.server_port}", upstream_url)
+    server.shutdown()
+    print("\nno upstream connections leaked after HEAD requests, early hang-ups or unsent bodies")
@@ -0,0 +1,97 @@
+"""
+Rule-path parsing: previous substring/regex helpers vs the compiled matcher.
+
+    python -m benchmarks.bench_matcher [--queries 5000] [--repeat 5]
+
+The corpus mixes intents, limits, company names, periods, filters and
+filler words. Besides µs/query, it reports how many queries each version
+sends to the LLM fallback: the previous rules when neither an intent nor
+a keyword was found, the matcher only when no word is readable at all.
+"""
+import argparse
+import random
+import re
+import time
+
+from app.llm.matcher import TOKEN_RE, match
+
+# ---------------- PREVIOUS RULES (reference) ----------------
+
+LEGACY_SYNONYMS = {
+    "high_price": ["high", "highest", "top", "expensive", "costliest"],
+    "low_price": ["low", "lowest", "cheap", "cheapest", "lowet"],
+    "high_volume": ["most traded", "high volume", "top volume"],
+    "low_volume": ["low volume", "least traded"],
+}
+LEGACY_GENERIC = {"stock", "stocks", "market", "nse", "shares", "show", "me", "get", "find", "give", "list"}
+
+
+def legacy_parse(q):
+    m = re.search(r'(top|first)\s*(\d+)', q)
+    limit = int(m.group(2)) if m else None
+    intent = next((i for i, words in LEGACY_SYNONYMS.items() if any(w in q for w in words)), None)
+    keywords = [
+        w for w in re.findall(r"[a-zA-Z]+", q.lower())
+        if w not in LEGACY_GENERIC and w not in sum(LEGACY_SYNONYMS.values(), [])
+    ]
+    return {"intent": intent, "keywords": keywords, "limit": limit, "llm": not (intent or keywords)}
+
+
+def compiled_parse(q):
+    return dict(match(q), llm=not TOKEN_RE.search(q))
+
+# ---------------- CORPUS ----------------
+
+COMPANIES = ["wipro", "cipla", "maruti", "reliance", "infy", "tcs", "ntpc", "axisbank", "zeel",
+             "bajaj-auto", "asianpaint", "bhartiartl", "tata motors", "hdfc bank", "adaniports"]
+INTENT_WORDS = ["expensive", "cheapest", "most traded", "low volume", "highest turnover",
+                "strong delivery", "penny", "most active", "top volume", "costliest", "similar to"]
+FILLERS = ["show me", "give me", "find", "list", "what are the", "which are the", "please show",
+           "", "", ""]
+TAILS = ["", "", "stocks", "shares", "last 4 quarters", "last 6 months", "weekly", "today",
+         "on nse", "right now", "close above 500", "volume > 100000"]
+
+
+def make_corpus(n, seed=11):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(n):
+        parts = [rng.choice(FILLERS)]
+        if rng.random() < 0.5:
+            parts.append(rng.choice(["top", "first", "bottom"]) + f" {rng.randint(1, 25)}")
+        if rng.random() < 0.7:
+            parts.append(rng.choice(INTENT_WORDS))
+        if rng.random() < 0.5:
+            parts.append(rng.choice(COMPANIES))
+        parts.append(rng.choice(TAILS))
+        query = " ".join(p for p in parts if p).lower()
+        if query:
+            corpus.append(query)
+    return corpus
+
+
+def timed(fn, corpus, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [fn(q) for q in corpus]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.queries)
+    print(f"{len(corpus)} queries, best of {args.repeat}")
+    print(f"{'version':>10} {'µs/query':>9} {'LLM fallbacks':>14} {'with intent':>12} {'with limit':>11}")
+
+    for name, fn in (("previous", legacy_parse), ("compiled", compiled_parse)):
+        elapsed, results = timed(fn, corpus, args.repeat)
+        print(f"{name:>10} {elapsed / len(corpus) * 1e6:>9.1f} "
+              f"{sum(r['llm'] for r in results):>14} "
+              f"{sum(bool(r['intent']) for r in results):>12} "
+              f"{sum(r['limit'] is not None for r in results):>11}")
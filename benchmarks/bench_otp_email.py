@@ -0,0 +1,138 @@
+"""
+/auth/register latency with inline vs queued OTP delivery.
+
+    python -m benchmarks.bench_otp_email [--requests 200] [--handshake-ms 150] [--rtt-ms 10]
+                                         [--drop-every 50]
+
+A small SMTP stand-in (EHLO / AUTH PLAIN / MAIL / RCPT / DATA / NOOP /
+QUIT, stdlib sockets) runs on a loopback port; it sleeps --handshake-ms on
+every new connection (TLS + AUTH of a real relay) and --rtt-ms per command,
+and hangs up after --drop-every messages on one session so the worker has
+to reconnect. The app runs on a throwaway SQLite database. "inline" is the previous
+connect / login / send / quit inside the request; "queued" is
+email_queue.enqueue_otp with the background worker.
+"""
+import argparse
+import os
+import socketserver
+import tempfile
+import threading
+import time
+
+import numpy as np
+from sqlalchemy import create_engine
+
+from app import create_app
+from app import db as app_db
+from app.models.email_otp import EmailOTP  # noqa: F401  (registers the table)
+from app.models.email_user import EmailUser  # noqa: F401
+from app.services import email_queue, emailer
+
+
+class SMTPStub(socketserver.StreamRequestHandler):
+    handshake = 0.0
+    rtt = 0.0
+    drop_every = 0
+    delivered = 0
+    connections = 0
+
+    def reply(self, line):
+        time.sleep(self.rtt)
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        SMTPStub.connections += 1
+        sent = 0
+        time.sleep(self.handshake)
+        self.reply("220 stub ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip().upper()
+
+            if command.startswith(("EHLO", "HELO")):
+                self.wfile.write(b"250-stub\r\n250-AUTH PLAIN\r\n")
+                self.reply("250 OK")
+            elif command.startswith("AUTH"):
+                self.reply("235 Authentication successful")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                SMTPStub.delivered += 1
+                sent += 1
+                self.reply("250 Queued")
+                if sent == self.drop_every:
+                    return  # drop the session, like an idle / overloaded relay
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+def run(client, mode, requests):
+    latencies = []
+    for i in range(requests):
+        payload = {"username": f"{mode}{i}", "email": f"{mode}{i}@example.com", "password": "secret"}
+        start = time.perf_counter()
+        resp = client.post("/auth/register", json=payload)
+        latencies.append(time.perf_counter() - start)
+        assert resp.status_code == 201, resp.get_json()
+    return np.array(latencies) * 1000
+
+
+def report(mode, ms):
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    print(f"{mode:<8} p50 {p50:7.1f} ms   p95 {p95:7.1f} ms   p99 {p99:7.1f} ms   max {ms.max():7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--handshake-ms", type=float, default=150)
+    parser.add_argument("--rtt-ms", type=float, default=10)
+    parser.add_argument("--drop-every", type=int, default=50)
+    args = parser.parse_args()
+
+    SMTPStub.handshake = args.handshake_ms / 1000
+    SMTPStub.rtt = args.rtt_ms / 1000
+    SMTPStub.drop_every = args.drop_every
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SMTPStub)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # the stand-in speaks plain SMTP
+    emailer.SMTP_HOST, emailer.SMTP_PORT = server.server_address
+    emailer.SMTP_STARTTLS = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        app_db.Base.metadata.create_all(engine)
+        app_db.SessionLocal.configure(bind=engine)
+        client = create_app().test_client()
+
+        print(f"{args.requests} registrations, handshake {args.handshake_ms:.0f} ms, "
+              f"rtt {args.rtt_ms:.0f} ms, drop after {args.drop_every} messages\n")
+
+        queued_send = email_queue.enqueue_otp
+        email_queue.enqueue_otp = emailer.send_otp_email
+        SMTPStub.connections = 0
+        report("inline", run(client, "inline", args.requests))
+        print(f"         smtp connections {SMTPStub.connections}\n")
+
+        email_queue.enqueue_otp = queued_send
+        SMTPStub.connections = 0
+        start = time.perf_counter()
+        report("queued", run(client, "queued", args.requests))
+        email_queue.flush(timeout=120)
+        drained = time.perf_counter() - start
+        print(f"         smtp connections {SMTPStub.connections}, all delivered after {drained:.1f} s")
+        print(f"         worker {email_queue.stats()}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
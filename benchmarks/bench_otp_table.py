@@ -0,0 +1,134 @@
+"""
+email_otps lookups and purge on a large seeded table.
+
+    python -m benchmarks.bench_otp_table [--users 20000] [--per-user 50] [--lookups 2000]
+
+Seeds a throwaway SQLite database with --users × --per-user OTP rows (a
+few recent, the rest long used / expired, as the table looks after months
+without cleanup). Times the verify_otp lookup and the resend_otp window
+count (the queries the routes run) without and with the model's indexes,
+then times otp_purge.purge_expired and the lookups on the purged table.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine, desc, insert, text
+
+from app import db as app_db
+from app.models.email_otp import EmailOTP
+from app.models.email_user import EmailUser
+from app.services import otp_purge
+
+
+def seed(engine, users, per_user):
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(EmailUser), [
+            {"id": u, "username": f"u{u}", "email": f"u{u}@example.com", "password_hash": "x"}
+            for u in range(1, users + 1)
+        ])
+        rows = []
+        for u in range(1, users + 1):
+            for k in range(per_user):
+                recent = k >= per_user - 2
+                created = now - (timedelta(minutes=random.randint(0, 9)) if recent
+                                 else timedelta(days=random.randint(1, 180)))
+                rows.append({
+                    "user_id": u, "otp": "123456", "purpose": "verify_email", "attempts": 0,
+                    "is_used": not recent, "created_at": created,
+                    "expires_at": created + timedelta(minutes=10),
+                })
+            if len(rows) >= 50000:
+                conn.execute(insert(EmailOTP), rows)
+                rows = []
+        if rows:
+            conn.execute(insert(EmailOTP), rows)
+
+
+def verify_lookup(db, user_id):
+    return (
+        db.query(EmailOTP)
+        .filter_by(user_id=user_id, purpose="verify_email", is_used=False)
+        .order_by(desc(EmailOTP.created_at))
+        .first()
+    )
+
+
+def resend_count(db, user_id):
+    return (
+        db.query(EmailOTP)
+        .filter(
+            EmailOTP.user_id == user_id,
+            EmailOTP.purpose == "verify_email",
+            EmailOTP.created_at >= otp_purge.window_start(db)
+        )
+        .count()
+    )
+
+
+def time_queries(users, lookups):
+    db = app_db.SessionLocal()
+    result = {}
+    try:
+        for name, query in (("verify lookup", verify_lookup), ("resend count", resend_count)):
+            ms = []
+            for user_id in random.choices(range(1, users + 1), k=lookups):
+                start = time.perf_counter()
+                query(db, user_id)
+                ms.append((time.perf_counter() - start) * 1000)
+            result[name] = np.percentile(ms, [50, 99])
+    finally:
+        db.close()
+    return result
+
+
+def report(label, result, rows):
+    print(f"{label}  ({rows:,} rows)")
+    for name, (p50, p99) in result.items():
+        print(f"    {name:<14} p50 {p50:8.3f} ms   p99 {p99:8.3f} ms")
+
+
+def count(engine):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT COUNT(*) FROM email_otps")).scalar()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--per-user", type=int, default=50)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+    random.seed(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        app_db.SessionLocal.configure(bind=engine)
+        app_db.Base.metadata.create_all(engine)
+        for index in EmailOTP.__table__.indexes:
+            index.drop(engine)
+
+        start = time.perf_counter()
+        seed(engine, args.users, args.per_user)
+        print(f"seeded {count(engine):,} OTP rows in {time.perf_counter() - start:.1f} s\n")
+
+        report("no indexes", time_queries(args.users, args.lookups), count(engine))
+
+        start = time.perf_counter()
+        otp_purge.create_indexes()
+        print(f"\ncreated indexes in {time.perf_counter() - start:.1f} s")
+        report("indexed", time_queries(args.users, args.lookups), count(engine))
+
+        start = time.perf_counter()
+        deleted = otp_purge.purge_expired()
+        print(f"\npurged {deleted:,} rows in {time.perf_counter() - start:.1f} s")
+        report("indexed + purged", time_queries(args.users, args.lookups), count(engine))
+
+
+if __name__ == "__main__":
+    main()
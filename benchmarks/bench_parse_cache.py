@@ -0,0 +1,239 @@
+"""
+LLM parse cache: behaviour checks, then hit rate, single-flight and LLM time saved.
+
+    python -m benchmarks.bench_parse_cache [--queries 2000] [--distinct 150] [--threads 16] [--latency 0.05]
+
+Runs offline through the real parser: parser.get_client() is replaced by
+a local client whose models.generate_content sleeps `--latency` seconds,
+counts calls and answers with fenced JSON, so llm_parse (prompt building,
+fence stripping, defaults) runs as in production. Queries are Devanagari
+phrasings, which always take the LLM fallback of parse_query.
+
+Checked before the load run (AssertionError on failure):
+- the model sees the query as typed, the cache key is normalized;
+- concurrent identical misses make one LLM call;
+- entries expire after the TTL and the LRU evicts the oldest entry;
+- an LLM error reaches every waiter and is not cached;
+- a persisted cache is reloaded after a restart without new calls.
+
+The load run then issues a Zipf-like mix of queries with random spacing
+from a thread pool, so identical misses overlap.
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import fakes
+from app.llm import parse_cache, parser
+
+# no Latin letters or digits: parse_query always falls back to the LLM
+WORDS = ["सबसे", "सस्ते", "शेयर", "महंगे", "ज़्यादा", "वॉल्यूम", "कंपनी", "दिखाओ", "बैंक", "आज",
+         "टॉप", "कम"]
+
+
+class FakeClient:
+    """Stand-in for genai.Client: counts calls, sleeps, answers with fenced JSON."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+        self.fail = set()
+        self.prompts = []
+        self._lock = threading.Lock()
+        self.models = types.SimpleNamespace(generate_content=self.generate_content)
+
+    def generate_content(self, model, contents, config=None):
+        with self._lock:
+            self.calls += 1
+            self.prompts.append(contents)
+        time.sleep(self.latency)
+
+        query = contents.strip().rsplit("\n", 1)[-1]
+        assert "User Query:" in contents, "prompt template not applied"
+        if query in self.fail:
+            raise RuntimeError(f"LLM unavailable for {query!r}")
+        body = json.dumps({"intent": "high_volume", "keywords": query.split()})
+        return types.SimpleNamespace(text=f"```json\n{body}\n```")
+
+
+def reset(size=1024, ttl=3600, path=None):
+    parse_cache.PARSE_CACHE_SIZE = size
+    parse_cache.PARSE_CACHE_TTL_SECONDS = ttl
+    parse_cache.PARSE_CACHE_PATH = path
+    with parse_cache._lock:
+        parse_cache._entries.clear()
+        parse_cache._inflight.clear()
+        for key in parse_cache._stats:
+            parse_cache._stats[key] = 0
+    parse_cache._state["loaded"] = False
+
+
+def query(*words):
+    return " ".join(words)
+
+
+def check_parse(client):
+    reset()
+    before = client.calls
+    result = parser.parse_query(f"  {query('सबसे', 'सस्ते')}  ")
+    assert client.calls == before + 1
+    assert result == {"intent": "high_volume", "keywords": ["सबसे", "सस्ते"], "filters": [], "limit": None}, result
+    print("llm_parse through the stub client: fenced JSON parsed, defaults filled")
+
+    # Cyrillic has case and skips the rule path: the model must see the text as typed,
+    # while other casings / spacings still share its cache entry
+    original = "Акции  Сбербанка"
+    parser.parse_query(original)
+    assert original in client.prompts[-1], client.prompts[-1]
+    before = client.calls
+    parser.parse_query("акции сбербанка")
+    assert client.calls == before, "differently cased query missed the cache"
+    print("llm_parse gets the original query; the cache key is normalized")
+
+
+def check_single_flight(client, threads=12):
+    reset()
+    before = client.calls
+    client.latency, latency = 0.2, client.latency
+    barrier = threading.Barrier(threads)
+
+    def ask(_):
+        barrier.wait()
+        return parser.parse_query(query("शेयर", "आज"))
+
+    with ThreadPoolExecutor(threads) as pool:
+        results = list(pool.map(ask, range(threads)))
+    client.latency = latency
+
+    assert client.calls == before + 1, f"{client.calls - before} LLM calls for one query"
+    assert all(r == results[0] for r in results)
+    stats = parse_cache.stats()
+    assert stats["misses"] == 1 and stats["coalesced"] == threads - 1, stats
+    print(f"single-flight: {threads} concurrent identical misses, 1 LLM call")
+
+
+def check_ttl_and_lru(client):
+    reset(ttl=0.2)
+    before = client.calls
+    parser.parse_query(query("बैंक"))
+    parser.parse_query(query("बैंक"))
+    assert client.calls == before + 1
+    time.sleep(0.3)
+    parser.parse_query(query("बैंक"))
+    assert client.calls == before + 2 and parse_cache.stats()["expired"] == 1
+    print("ttl: entry served until expiry, then refetched")
+
+    reset(size=3)
+    a, b, c, d = (query(w) for w in ("टॉप", "कम", "कंपनी", "दिखाओ"))
+    for q in (a, b, c, a, d):   # touching `a` makes `b` the oldest
+        parser.parse_query(q)
+    before = client.calls
+    parser.parse_query(a)
+    assert client.calls == before, "recently used entry was evicted"
+    parser.parse_query(b)
+    assert client.calls == before + 1, "least recently used entry was not evicted"
+    assert parse_cache.stats()["evictions"] >= 1
+    print("lru: least recently used entry evicted at capacity")
+
+
+def check_errors(client, threads=6):
+    reset()
+    bad = query("महंगे", "शेयर")
+    client.fail.add(bad)
+    client.latency, latency = 0.2, client.latency
+    barrier = threading.Barrier(threads)
+    before = client.calls
+
+    def ask(_):
+        barrier.wait()
+        try:
+            parser.parse_query(bad)
+        except RuntimeError as e:
+            return e
+        return None
+
+    with ThreadPoolExecutor(threads) as pool:
+        errors = list(pool.map(ask, range(threads)))
+    client.latency = latency
+
+    assert all(isinstance(e, RuntimeError) for e in errors), errors
+    assert client.calls == before + 1
+    client.fail.discard(bad)
+    parser.parse_query(bad)
+    assert client.calls == before + 2, "failed call was cached"
+    assert parse_cache.stats()["llm_errors"] == 1
+    print(f"errors: raised to all {threads} waiters, not cached")
+
+
+def check_persistence(client):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "parse_cache.json")
+        reset(path=path)
+        parser.parse_query(query("वॉल्यूम", "ज़्यादा"))
+        assert os.path.exists(path)
+
+        reset(path=path)   # a restart: empty memory, same file
+        before = client.calls
+        result = parser.parse_query(query("वॉल्यूम", "ज़्यादा"))
+        assert client.calls == before, "persisted entry was not reloaded"
+        assert result["keywords"] == ["वॉल्यूम", "ज़्यादा"]
+        reset()
+    print("persistence: entries reloaded from PARSE_CACHE_PATH after a restart")
+
+
+def make_corpus(n, distinct, seed=3):
+    rng = random.Random(seed)
+    bases = [" ".join(words) for words in itertools.islice(itertools.permutations(WORDS, 3), distinct)]
+    weights = [1 / (rank + 1) for rank in range(distinct)]
+
+    corpus = []
+    for base in rng.choices(bases, weights, k=n):
+        corpus.append(" " * rng.randint(0, 2) + base.replace(" ", " " * rng.randint(1, 2)) + " " * rng.randint(0, 2))
+    return corpus
+
+
+if __name__ == "__main__":
+    args_parser = argparse.ArgumentParser(description=__doc__)
+    args_parser.add_argument("--queries", type=int, default=2000)
+    args_parser.add_argument("--distinct", type=int, default=150)
+    args_parser.add_argument("--threads", type=int, default=16)
+    args_parser.add_argument("--latency", type=float, default=0.05)
+    args = args_parser.parse_args()
+
+    fakes.install()   # google.genai.types for llm_parse
+    client = FakeClient(args.latency)
+    parser.get_client = lambda: client
+
+    check_parse(client)
+    check_single_flight(client)
+    check_ttl_and_lru(client)
+    check_errors(client)
+    check_persistence(client)
+
+    reset()
+    corpus = make_corpus(args.queries, args.distinct)
+    before = client.calls
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as pool:
+        list(pool.map(parser.parse_query, corpus))
+    elapsed = time.perf_counter() - start
+
+    distinct = len(set(map(parse_cache.normalize, corpus)))
+    calls = client.calls - before
+    assert calls == distinct, f"{calls} LLM calls for {distinct} distinct queries"
+
+    uncached = args.queries * args.latency / args.threads
+    stats = parse_cache.stats()
+    print(f"\n{args.queries} queries ({distinct} distinct after normalizing), "
+          f"{args.threads} threads, {args.latency * 1000:.0f}ms stub LLM")
+    print(f"LLM calls: {calls}  hits: {stats['hits']}  coalesced: {stats['coalesced']}  "
+          f"hit rate: {stats['hit_rate']}")
+    print(f"wall: {elapsed:.2f}s cached vs ~{uncached:.2f}s uncached  "
+          f"LLM seconds saved: {stats['seconds_saved']}")
@@ -0,0 +1,118 @@
+"""
+/auth/login throughput at several password-hash costs.
+
+    python -m benchmarks.bench_password_hash [--users 20] [--clients 8] [--seconds 5]
+                                             [--costs pbkdf2:50000,pbkdf2:100000,pbkdf2:200000,scrypt:16384]
+
+For every cost setting, users are seeded into a throwaway SQLite database
+with hashes of that cost, then --clients threads log in for --seconds. The
+report gives logins/s, p50/p99 latency and how many requests the password
+pool turned away with 503. A final "legacy" run seeds old-format hashes
+and shows them being upgraded on first login.
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from sqlalchemy import create_engine
+
+from app import create_app
+from app import db as app_db
+from app.models.email_otp import EmailOTP  # noqa: F401  (registers the table)
+from app.models.email_user import EmailUser
+from app.services import password_pool
+from app.utils import hash_utils
+
+
+def legacy_hash(password):
+    salt = os.urandom(32).hex()
+    return salt + hash_utils._pbkdf2(password, salt, hash_utils.LEGACY_ITERATIONS).hex()
+
+
+def set_cost(cost):
+    scheme, value = cost.split(":")
+    hash_utils.PASSWORD_SCHEME = "scrypt" if scheme == "scrypt" else "pbkdf2_sha256"
+    if scheme == "scrypt":
+        hash_utils.SCRYPT_N = int(value)
+    else:
+        hash_utils.PBKDF2_ITERATIONS = int(value)
+
+
+def seed(engine, users, make_hash):
+    app_db.Base.metadata.drop_all(engine)
+    app_db.Base.metadata.create_all(engine)
+    db = app_db.SessionLocal()
+    db.add_all(
+        EmailUser(username=f"u{i}", email=f"u{i}@example.com", password_hash=make_hash("secret"),
+                  is_email_verified=True)
+        for i in range(users)
+    )
+    db.commit()
+    db.close()
+
+
+def drive(app, users, clients, seconds):
+    latencies, statuses = [], []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(n):
+        client = app.test_client()
+        i = n
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            resp = client.post("/auth/login", json={"email": f"u{i % users}@example.com", "password": "secret"})
+            with lock:
+                latencies.append(time.perf_counter() - start)
+                statuses.append(resp.status_code)
+            i += clients
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        list(pool.map(worker, range(clients)))
+    return np.array(latencies) * 1000, np.array(statuses), time.perf_counter() - start
+
+
+def report(label, ms, statuses, elapsed):
+    ok = ms[statuses == 200]
+    p50, p99 = np.percentile(ok, [50, 99]) if len(ok) else (float("nan"),) * 2
+    print(f"{label:<22} {len(ok) / elapsed:8.1f} logins/s   p50 {p50:7.1f} ms   p99 {p99:7.1f} ms   "
+          f"503s {int((statuses == 503).sum()):5d}   other {int(((statuses != 200) & (statuses != 503)).sum())}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--costs", default="pbkdf2:50000,pbkdf2:100000,pbkdf2:200000,scrypt:16384")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+                               connect_args={"check_same_thread": False})
+        app_db.SessionLocal.configure(bind=engine)
+        app = create_app()
+
+        print(f"{args.clients} clients, {args.seconds:.0f} s per cost, "
+              f"pool {password_pool.HASH_WORKERS} workers / {password_pool.HASH_QUEUE_LIMIT} admitted\n")
+
+        for cost in args.costs.split(","):
+            set_cost(cost)
+            seed(engine, args.users, hash_utils.hash_password)
+            report(cost, *drive(app, args.users, args.clients, args.seconds))
+
+        rehashed = password_pool.stats()["rehashed"]
+        seed(engine, args.users, legacy_hash)
+        report("legacy → " + args.costs.split(",")[-1], *drive(app, args.users, args.clients, args.seconds))
+        # concurrent first logins of one user may both rehash; the last write wins
+        print(f"\nrehashes on login: {password_pool.stats()['rehashed'] - rehashed} "
+              f"({args.users} legacy users)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Latency and recall of the related_stocks vector index.
+
+    python -m benchmarks.bench_related [--sizes 500 2000 5000] [--dim 384] [--k 10] [--queries 200]
+
+Synthetic centroids are drawn around a few "sector" centres so neighbours
+are meaningful. Recall@k is measured against a float64 full sort, which
+catches float32 / argpartition tie-handling regressions; upsert latency
+covers the incremental update an upload performs.
+"""
+import argparse
+import statistics
+import tempfile
+import time
+import numpy as np
+
+from app.embeddings import related_index
+
+
+def make_centroids(n, dim, sectors=20, seed=7):
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((sectors, dim))
+    return centres[rng.integers(0, sectors, n)] + 0.5 * rng.standard_normal((n, dim))
+
+
+def exact_neighbours(vectors, rows, k):
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = unit[rows] @ unit.T
+    scores[np.arange(len(rows)), rows] = -np.inf
+    return np.argsort(-scores, axis=1, kind="stable")[:, :k]
+
+
+def run(n, dim, k, queries, directory):
+    vectors = make_centroids(n, dim)
+    symbols = [f"SYM{i:05d}" for i in range(n)]
+
+    start = time.perf_counter()
+    for symbol, vector in zip(symbols, vectors):
+        related_index.upsert(symbol, vector, directory)
+    build = time.perf_counter() - start
+
+    rng = np.random.default_rng(1)
+    rows = rng.choice(n, size=min(queries, n), replace=False)
+
+    latencies, found = [], []
+    for row in rows:
+        t = time.perf_counter()
+        found.append(related_index.related(symbols[row], k, directory))
+        latencies.append(time.perf_counter() - t)
+
+    t = time.perf_counter()
+    related_index.related_many([symbols[r] for r in rows], k, directory)
+    batched = (time.perf_counter() - t) / len(rows)
+
+    expected = exact_neighbours(vectors, rows, k)
+    hits = sum(
+        len({symbols[j] for j in truth} & {s for s, _ in got})
+        for truth, got in zip(expected, found)
+    )
+    recall = hits / (len(rows) * k)
+
+    t = time.perf_counter()
+    for row in rows[:50]:
+        related_index.upsert(symbols[row], vectors[row] * 1.01, directory)
+    upsert = (time.perf_counter() - t) / min(len(rows), 50)
+
+    latencies.sort()
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    print(f"{n:>7} {build:>8.2f} {statistics.median(latencies) * 1000:>9.2f} {p95 * 1000:>8.2f} "
+          f"{batched * 1000:>10.3f} {upsert * 1000:>9.2f} {recall:>9.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 2000, 5000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'symbols':>7} {'build s':>8} {'p50 ms':>9} {'p95 ms':>8} {'batched ms':>10} "
+          f"{'upsert ms':>9} {f'recall@{args.k}':>9}")
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            run(n, args.dim, args.k, args.queries, tmp)
@@ -0,0 +1,113 @@
+"""
+Symbol resolution: indexed lookup vs the previous substring scan.
+
+    python -m benchmarks.bench_resolver [--symbols 10000 50000] [--queries 2000]
+
+Synthetic NSE-like symbols; queries are a mix of exact symbols, prefixes,
+inner substrings, one-typo misspellings and misses. Reports index build
+time and per-kind latency percentiles.
+"""
+import argparse
+import random
+import string
+import time
+
+from app.services import symbol_index
+
+KINDS = ("exact", "prefix", "substring", "typo", "miss")
+
+
+def make_symbols(n, seed=5):
+    rng = random.Random(seed)
+    symbols = set()
+    while len(symbols) < n:
+        symbol = "".join(rng.choices(string.ascii_uppercase, k=rng.randint(3, 12)))
+        if rng.random() < 0.05:
+            symbol = symbol[:4] + rng.choice("-&") + symbol[4:]
+        symbols.add(symbol)
+    return sorted(symbols)
+
+
+def typo(word, rng):
+    i = rng.randrange(len(word) - 1)
+    edit = rng.choice(("swap", "drop", "sub", "add"))
+    if edit == "swap":
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    if edit == "drop":
+        return word[:i] + word[i + 1:]
+    if edit == "sub":
+        return word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+    return word[:i] + rng.choice(string.ascii_lowercase) + word[i:]
+
+
+def make_queries(symbols, n, seed=9):
+    rng = random.Random(seed)
+    longer = [s for s in symbols if len(s) >= 6]
+    queries = []
+    for _ in range(n):
+        kind = rng.choice(KINDS)
+        symbol = rng.choice(longer).lower()
+        if kind == "exact":
+            query = symbol
+        elif kind == "prefix":
+            query = symbol[:rng.randint(3, len(symbol) - 1)]
+        elif kind == "substring":
+            query = symbol[1:-1]
+        elif kind == "typo":
+            query = typo(symbol, rng)
+        else:
+            query = "".join(rng.choices(string.ascii_lowercase, k=8))
+        queries.append((kind, query))
+    return queries
+
+
+def scan(symbols, keyword):
+    """The previous resolver: substring test against every symbol."""
+    return list({s for s in symbols if keyword in s.lower()})
+
+
+def percentiles(values):
+    values = sorted(values)
+    pick = lambda q: values[int(q * (len(values) - 1))] * 1e6
+    return pick(0.5), pick(0.95), pick(0.99)
+
+
+def run(n, queries_n):
+    symbols = make_symbols(n)
+
+    start = time.perf_counter()
+    index = symbol_index.build(symbols)
+    build = time.perf_counter() - start
+
+    queries = make_queries(symbols, queries_n)
+    timings = {kind: [] for kind in KINDS}
+    found = {kind: 0 for kind in KINDS}
+    for kind, query in queries:
+        t = time.perf_counter()
+        result = symbol_index.lookup(index, query)
+        timings[kind].append(time.perf_counter() - t)
+        found[kind] += bool(result)
+
+    scan_times = []
+    for _, query in queries[:200]:
+        t = time.perf_counter()
+        scan(symbols, query)
+        scan_times.append(time.perf_counter() - t)
+
+    print(f"\n{n} symbols, index built in {build:.2f}s")
+    print(f"{'kind':>10} {'p50 µs':>8} {'p95 µs':>8} {'p99 µs':>8} {'matched':>8}")
+    for kind in KINDS:
+        p50, p95, p99 = percentiles(timings[kind])
+        print(f"{kind:>10} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f} {found[kind] / len(timings[kind]):>8.0%}")
+    p50, p95, p99 = percentiles(scan_times)
+    print(f"{'old scan':>10} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    for n in args.symbols:
+        run(n, args.queries)
@@ -0,0 +1,68 @@
+"""
+Application startup time and import-time report.
+
+    python -m benchmarks.bench_startup [--repeat 5] [--top 25] [--warm-up]
+
+Each run is a fresh interpreter that imports app and calls create_app(),
+so module caches never hide import cost. The report is built from
+`python -X importtime` and lists the slowest imports (cumulative, i.e.
+including their own imports) under create_app().
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+SNIPPET = """
+import time
+start = time.perf_counter()
+from app import create_app
+create_app(warm_up={warm_up})
+print(f"STARTUP {{time.perf_counter() - start:.6f}}")
+"""
+
+
+def startup_times(repeat, warm_up):
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", SNIPPET.format(warm_up=warm_up)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        times.append(float(out.rsplit("STARTUP", 1)[1]))
+    return times
+
+
+def import_report(top, warm_up):
+    """[(cumulative_us, self_us, module)] from -X importtime, slowest first."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SNIPPET.format(warm_up=warm_up)],
+        capture_output=True, text=True, check=True
+    ).stderr
+
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), module.rstrip()))
+
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--warm-up", action="store_true", help="also load models in create_app()")
+    args = parser.parse_args()
+
+    times = startup_times(args.repeat, args.warm_up)
+    print(f"create_app() startup over {args.repeat} run(s): "
+          f"median {statistics.median(times) * 1000:.0f}ms, "
+          f"min {min(times) * 1000:.0f}ms, max {max(times) * 1000:.0f}ms")
+
+    print(f"\n{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative_us, self_us, module in import_report(args.top, args.warm_up):
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {module}")
@@ -0,0 +1,198 @@
+"""
+Batched embedding inserts: correctness check plus rows/s.
+
+    python -m benchmarks.bench_vector_db [--rows 2300] [--batch 500] [--dim 384]
+                                         [--database-url postgresql://...]
+
+By default the writer runs against a throwaway SQLite file: the real
+store_embeddings and pooled_connection are used, with a small pool that
+hands out SQLite connections and an execute_values that writes the same
+multi-row VALUES statements with SQLite placeholders. With
+--database-url it runs against that Postgres (pgvector) instead.
+
+Checks, with a batch smaller than the row count:
+- every row landed once, with its embedding and metadata intact;
+- the expected number of INSERT statements ran and vector_db.stats()
+  recorded the rows and rows/s;
+- app.database.embeddings_repo.store_embeddings is the same writer and works;
+- a failing insert rolls back and the connection goes back to the pool.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import uuid
+
+import numpy as np
+
+from app.database import embeddings_repo, postgres
+from app.embeddings import vector_db
+
+
+class SQLiteCursor:
+    def __init__(self, conn):
+        self.cursor = conn.cursor()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cursor.close()
+
+
+class SQLiteConnection:
+    """The slice of a psycopg2 connection that pooled_connection / store_embeddings use."""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.closed = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return SQLiteCursor(self.conn)
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.conn.rollback()
+
+
+class SQLitePool:
+    def __init__(self, path):
+        self.conn = SQLiteConnection(path)
+        self.out = 0
+
+    def getconn(self):
+        self.out += 1
+        return self.conn
+
+    def putconn(self, conn, close=False):
+        self.out -= 1
+
+
+def sqlite_execute_values(cursor, sql, rows, page_size=100):
+    """execute_values for the stand-in: one multi-row statement per page."""
+    _stats["statements"] += 1
+    placeholders = ", ".join(["(?, ?)"] * len(rows))
+    params = [value for emb, meta in rows for value in (json.dumps(list(map(float, emb))), meta)]
+    cursor.cursor.execute(sql.replace("%s", placeholders), params)
+
+
+_stats = {"statements": 0}
+
+
+def use_sqlite(path):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE stock_embeddings (id INTEGER PRIMARY KEY, embedding TEXT, metadata TEXT)")
+    conn.close()
+    postgres._pool = SQLitePool(path)
+    vector_db.execute_values = sqlite_execute_values
+
+    def fetch(run_id):
+        cur = postgres._pool.conn.conn.execute(
+            "SELECT embedding, metadata FROM stock_embeddings WHERE metadata LIKE ? ORDER BY id",
+            (f'%"run": "{run_id}"%',)
+        )
+        return [(json.loads(emb), json.loads(meta)) for emb, meta in cur.fetchall()]
+    return fetch
+
+
+def use_postgres(url):
+    from psycopg2.pool import ThreadedConnectionPool
+    postgres._pool = ThreadedConnectionPool(1, 2, dsn=url)
+
+    def fetch(run_id):
+        with postgres.pooled_connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                "SELECT embedding::text, metadata::text FROM stock_embeddings "
+                "WHERE metadata::jsonb ->> 'run' = %s ORDER BY id", (run_id,)
+            )
+            return [(json.loads(emb), json.loads(meta)) for emb, meta in cur.fetchall()]
+    return fetch
+
+
+def make_rows(n, dim, run_id, rng):
+    embeddings = rng.standard_normal((n, dim)).astype(np.float32).round(4).tolist()
+    metadata = [{"run": run_id, "row": i, "symbol": f"SYM{i % 7}"} for i in range(n)]
+    return embeddings, metadata
+
+
+def check_insert(writer, fetch, rows, batch, dim, rng):
+    run_id = uuid.uuid4().hex
+    embeddings, metadata = make_rows(rows, dim, run_id, rng)
+    before = vector_db.stats()
+    statements = _stats["statements"]
+
+    rate = writer(embeddings, metadata, batch_size=batch)
+
+    stored = fetch(run_id)
+    assert len(stored) == rows, f"{len(stored)} of {rows} rows landed"
+    for (emb, meta), want_emb, want_meta in zip(stored, embeddings, metadata):
+        assert meta == want_meta, (meta, want_meta)
+        assert np.allclose(emb, want_emb, atol=1e-4), meta
+
+    after = vector_db.stats()
+    expected = -(-rows // batch)
+    assert after["rows"] - before["rows"] == rows
+    assert after["statements"] - before["statements"] == expected
+    assert after["calls"] == before["calls"] + 1
+    assert after["last_rows_per_sec"] and after["last_rows_per_sec"] > 0
+    if isinstance(postgres._pool, SQLitePool):
+        assert _stats["statements"] - statements == expected, "rows were not batched"
+        assert postgres._pool.out == 0, "connection not returned to the pool"
+    return rate
+
+
+def check_rollback():
+    pool = postgres._pool
+    original = vector_db.execute_values
+
+    def failing(*args, **kwargs):
+        raise RuntimeError("insert failed")
+
+    vector_db.execute_values = failing
+    try:
+        vector_db.store_embeddings([[0.0]], [{"run": "rollback"}])
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("failing insert did not raise")
+    finally:
+        vector_db.execute_values = original
+    assert pool.out == 0 and pool.conn.rollbacks == 1, "failed insert was not rolled back and returned"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2300)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+    assert args.batch < args.rows, "use a batch smaller than the row count"
+    rng = np.random.default_rng(3)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.database_url:
+            fetch = use_postgres(args.database_url)
+        else:
+            fetch = use_sqlite(os.path.join(tmp, "vectors.db"))
+
+        assert embeddings_repo.store_embeddings is vector_db.store_embeddings
+        for name, writer in (("vector_db", vector_db.store_embeddings),
+                             ("embeddings_repo", embeddings_repo.store_embeddings)):
+            rate = check_insert(writer, fetch, args.rows, args.batch, args.dim, rng)
+            print(f"{name:<16} {args.rows} rows in batches of {args.batch}: ok ({rate:,.0f} rows/s)")
+
+        if not args.database_url:
+            check_rollback()
+            print("rollback on failure: ok")
+
+        print(f"\nvector_db.stats() {vector_db.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Offline stand-ins for the Gemini client and the sentence-transformers model.
+
+install() puts fake `google.genai` and `sentence_transformers` modules in
+sys.modules and resets the app's lazily created client / model, so
+benchmarks never reach the network or load model weights. The fake LLM
+sleeps `llm_latency` seconds per call and answers with a parse that uses
+the query's words as keywords; the fake embedder returns deterministic
+unit vectors per text.
+"""
+import json
+import sys
+import time
+import types
+import zlib
+
+import numpy as np
+
+DIMENSIONS = 384
+
+_config = {"llm_latency": 0.0, "calls": 0}
+
+
+class _Models:
+    def generate_content(self, model, contents, config=None):
+        _config["calls"] += 1
+        time.sleep(_config["llm_latency"])
+        query = contents.strip().rsplit("\n", 1)[-1] if isinstance(contents, str) else ""
+        parsed = {"intent": None, "keywords": query.lower().split()[:3], "filters": [], "limit": None}
+        return types.SimpleNamespace(text=json.dumps(parsed))
+
+
+class Client:
+    def __init__(self, api_key=None, **kwargs):
+        self.models = _Models()
+
+
+class GenerateContentConfig:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class SentenceTransformer:
+    def __init__(self, name, **kwargs):
+        self.name = name
+
+    def get_sentence_embedding_dimension(self):
+        return DIMENSIONS
+
+    def encode(self, texts, batch_size=32, **kwargs):
+        out = np.empty((len(texts), DIMENSIONS), dtype=np.float32)
+        for i, text in enumerate(texts):
+            vector = np.random.default_rng(zlib.crc32(text.encode("utf-8"))).standard_normal(DIMENSIONS)
+            out[i] = vector / np.linalg.norm(vector)
+        return out
+
+
+def install(llm_latency=0.0):
+    """Swap in the fakes (idempotent); returns the shared counters."""
+    _config["llm_latency"] = llm_latency
+
+    genai = types.ModuleType("google.genai")
+    genai.Client = Client
+    genai.types = types.ModuleType("google.genai.types")
+    genai.types.GenerateContentConfig = GenerateContentConfig
+    google = sys.modules.get("google") or types.ModuleType("google")
+    google.genai = genai
+    sys.modules.update({"google": google, "google.genai": genai, "google.genai.types": genai.types})
+
+    st = types.ModuleType("sentence_transformers")
+    st.SentenceTransformer = SentenceTransformer
+    sys.modules["sentence_transformers"] = st
+
+    from app.llm import parser
+    from app.embeddings import embedder
+    parser._client = None
+    embedder._model = None
+    return _config
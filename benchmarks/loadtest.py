@@ -0,0 +1,246 @@
+"""
+End-to-end load test of create_app() with local stand-ins.
+
+    python -m benchmarks.loadtest [--symbols 200] [--days 500] [--concurrency 8] [--duration 30]
+                                  [--mix chat=6,chat_llm=1,analytics=3,upload=1]
+                                  [--llm-latency-ms 400] [--database-url sqlite:///...]
+
+Everything runs in one process:
+- the app is served by a threaded werkzeug server on a loopback port and
+  driven over HTTP by --concurrency client threads for --duration seconds
+  (after --warmup seconds that are not recorded);
+- UPLOAD_DIR, the embedding cache and the related index live in a temp
+  directory filled with a synthetic universe (benchmarks.synthetic);
+- DATABASE_URL defaults to a SQLite file there (pass a local Postgres URL
+  to use one); SQLite stands in for SQLAlchemy only: the pgvector insert of
+  the upload jobs and the psycopg2 pool's DSN check are skipped;
+- Gemini and the embedder are the fakes from benchmarks.fakes; the fake
+  LLM sleeps --llm-latency-ms per call.
+
+Mix weights pick the next request: chat (rule-path queries), chat_llm
+(non-Latin queries that go through the LLM fallback and its cache),
+analytics (one of /analytics/stats, /top-stocks, /volume) and upload
+(/upload-csv of a rotating set of symbols). The report gives per endpoint
+the count, non-2xx responses, p50/p95/p99 latency, throughput and the
+largest process RSS seen when its requests finished (the server shares
+the process, so RSS is attributed, not isolated), plus the overall peak.
+"""
+import argparse
+import io
+import logging
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+from benchmarks import fakes
+
+CHAT_QUERIES = [
+    "top 10 stocks by volume",
+    "cheapest stocks",
+    "show me sym00012",
+    "most traded stocks last 4 quarters",
+    "high delivery stocks weekly",
+    "stocks with close above 500",
+    "bottom five by price",
+    "show me all stocks",
+    "sym00003 monthly",
+    "stocks similar to sym00007",
+]
+
+# no Latin letters or digits: these always take the LLM fallback
+LLM_WORDS = ["सबसे", "सस्ते", "शेयर", "महंगे", "ज़्यादा", "वॉल्यूम", "कंपनी", "दिखाओ",
+             "बैंक", "आज", "टॉप", "कम"]
+
+ANALYTICS = ["/analytics/stats", "/analytics/top-stocks", "/analytics/volume"]
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - {"chat", "chat_llm", "analytics", "upload"}
+    if unknown:
+        raise SystemExit(f"unknown mix entries: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+
+
+def upload_bodies(count, days, seed=11):
+    """In-memory CSVs for the upload share: LOAD0000..LOADnnnn, uploaded round-robin."""
+    from benchmarks.synthetic import make_frame
+
+    rng = np.random.default_rng(seed)
+    bodies = []
+    for i in range(count):
+        df = make_frame(f"LOAD{i:04d}", days, rng)
+        df["date"] = df["date"].dt.strftime("%d-%m-%Y")
+        bodies.append((f"cleaned_LOAD{i:04d}.csv", df.to_csv(index=False).encode()))
+    return bodies
+
+
+def prepare_environment(args, tmp):
+    """
+    Env for app.config, set before anything from `app` is imported (the
+    synthetic generator imports the store, so it comes after), then the
+    generated universe.
+    """
+    upload_dir = os.path.join(tmp, "uploads")
+    os.makedirs(upload_dir)
+    os.environ["UPLOAD_DIR"] = upload_dir
+    os.environ["EMBEDDING_CACHE_DIR"] = os.path.join(tmp, "embedding_cache")
+    os.environ["RELATED_INDEX_DIR"] = os.path.join(tmp, "related_index")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tmp, 'loadtest.db')}"
+
+    from benchmarks.synthetic import write_csv_universe
+    start = time.perf_counter()
+    write_csv_universe(upload_dir, args.symbols, args.days, malformed=args.malformed)
+    print(f"generated {args.symbols} symbols × {args.days} days in {time.perf_counter() - start:.1f}s")
+
+
+def start_app(args):
+    fakes.install(llm_latency=args.llm_latency_ms / 1000)
+
+    from werkzeug.serving import make_server
+    from app import create_app
+    from app import db as app_db
+    from app.database import postgres
+    from app.models import email_otp, email_user  # noqa: F401  (register the tables)
+    from app.services import upload_jobs
+
+    app_db.Base.metadata.create_all(app_db.engine)
+    if app_db.engine.dialect.name != "postgresql":
+        # stock_embeddings is a pgvector table: nothing to write on SQLite,
+        # and the psycopg2 pool (the only part that needs Postgres) is never opened
+        upload_jobs.store_embeddings = lambda embeddings, metadata, **kwargs: 0.0
+        postgres.check_dsn = lambda dsn=None: None
+
+    app = create_app(warm_up=args.warm_up)
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def drive(base_url, args, mix, bodies):
+    """Run the mix; returns {endpoint: [(latency_s, status, rss_mb)]} and the measured seconds."""
+    samples = {}
+    lock = threading.Lock()
+    upload_turn = iter(range(10 ** 9))
+    names, weights = list(mix), list(mix.values())
+    start = time.perf_counter()
+    record_from = start + args.warmup
+    deadline = record_from + args.duration
+
+    def request_once(session, rng):
+        kind = rng.choices(names, weights)[0]
+        if kind == "chat":
+            label, call = "/chat", lambda: session.post(
+                f"{base_url}/chat", json={"query": rng.choice(CHAT_QUERIES)})
+        elif kind == "chat_llm":
+            query = " ".join(rng.sample(LLM_WORDS, 3))
+            label, call = "/chat (llm)", lambda: session.post(f"{base_url}/chat", json={"query": query})
+        elif kind == "analytics":
+            label = rng.choice(ANALYTICS)
+            call = lambda: session.get(f"{base_url}{label}")
+        else:
+            with lock:
+                filename, body = bodies[next(upload_turn) % len(bodies)]
+            label, call = "/upload-csv", lambda: session.post(
+                f"{base_url}/upload-csv", files={"file": (filename, io.BytesIO(body), "text/csv")})
+        return label, call
+
+    def worker(n):
+        rng = random.Random(n)
+        session = requests.Session()
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                return
+            label, call = request_once(session, rng)
+            t0 = time.perf_counter()
+            try:
+                status = call().status_code
+            except requests.RequestException:
+                status = 0
+            elapsed = time.perf_counter() - t0
+            if t0 >= record_from:
+                with lock:
+                    samples.setdefault(label, []).append((elapsed, status, current_rss_mb()))
+
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        list(pool.map(worker, range(args.concurrency)))
+    return samples, args.duration
+
+
+def report(samples, seconds):
+    print(f"\n{'endpoint':<22} {'count':>7} {'non-2xx':>8} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'RSS MB':>8}")
+    total = 0
+    for label in sorted(samples):
+        rows = samples[label]
+        ms = np.array([r[0] for r in rows]) * 1000
+        errors = sum(1 for r in rows if not 200 <= r[1] < 300)
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        total += len(rows)
+        print(f"{label:<22} {len(rows):>7} {errors:>8} {len(rows) / seconds:>8.1f} {p50:>9.1f} {p95:>9.1f} "
+              f"{p99:>9.1f} {max(r[2] for r in rows):>8.0f}")
+    print(f"{'all':<22} {total:>7} {'':>8} {total / seconds:>8.1f}")
+    print(f"\npeak RSS {peak_rss_mb():.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--days", type=int, default=500)
+    parser.add_argument("--malformed", type=float, default=0.01)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--mix", default="chat=6,chat_llm=1,analytics=3,upload=1")
+    parser.add_argument("--llm-latency-ms", type=float, default=400)
+    parser.add_argument("--upload-symbols", type=int, default=20)
+    parser.add_argument("--upload-days", type=int, default=250)
+    parser.add_argument("--database-url", default=None, help="default: SQLite file in the temp dir")
+    parser.add_argument("--warm-up", action="store_true", help="create_app(warm_up=True) first")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        prepare_environment(args, tmp)
+        server, base_url = start_app(args)
+        bodies = upload_bodies(args.upload_symbols, args.upload_days) if mix.get("upload") else []
+
+        print(f"{base_url}  concurrency {args.concurrency}  {args.duration:.0f}s (+{args.warmup:.0f}s warm-up)  "
+              f"mix {args.mix}  llm {args.llm_latency_ms:.0f} ms")
+        samples, seconds = drive(base_url, args, mix, bodies)
+        server.shutdown()
+
+        from app.services import upload_jobs
+        upload_jobs._executor.shutdown(wait=True)
+
+    report(samples, seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Hot-path benchmark suite with a stored baseline.
+
+    python -m benchmarks.suite                      # compare against benchmarks/baseline.json
+    python -m benchmarks.suite --update-baseline    # record this machine's numbers
+    python -m benchmarks.suite --sizes 50 500 --days 250 --malformed 0.01 --tolerance 1.0
+
+For every universe size a synthetic upload directory (dayfirst dates, a
+fraction of malformed cells) is generated and the app is pointed at it.
+Then run_screener, the /analytics routes, resolve_symbols and the rule
+path of parse_query are timed (median of --repeat warm calls). Runs
+offline: the Gemini client and the embedder are the fakes from
+benchmarks.fakes. Exits 1 when any timing is more than --tolerance slower
+than the baseline (and by more than --floor-ms), so it can gate CI.
+Baselines are machine-specific: refresh them on the machine that runs
+the check.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks import fakes
+from benchmarks.synthetic import write_csv_universe
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+FILTERS = [
+    {"field": "close", "operator": ">", "value": 100},
+    {"field": "volume", "operator": ">=", "value": 50_000},
+]
+
+QUERIES = [
+    "top 10 stocks by volume",
+    "cheapest stocks with close above 500",
+    "show me sym00012 last 4 quarters",
+    "most traded companies this month",
+    "high delivery stocks weekly",
+    "bottom five by price",
+    "sym0004 and sym0001",
+    "stocks similar to sym00003",
+]
+
+KEYWORD_SETS = [["sym00001"], ["sym0001"], ["sym00x12"], ["sym"], ["infosys"], ["nothing"]]
+
+
+def use_upload_dir(directory):
+    """Point every module that captured UPLOAD_DIR / CATALOG_PATH at `directory`."""
+    from app import config
+    from app.routes import upload
+    from app.screener import catalog, columnar, store
+
+    for module in (config, catalog, store, columnar, upload):
+        module.UPLOAD_DIR = directory
+    columnar.SIDECAR_DIR = os.path.join(directory, ".columnar")
+    catalog.CATALOG_PATH = os.path.join(directory, ".catalog.json")
+
+    catalog._catalog.update(mtime=None, checked_at=float("-inf"))
+    catalog.rebuild()
+    store.invalidate()
+
+
+def median_ms(fn, repeat):
+    fn()  # warm caches
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def bench_universe(client, size, repeat):
+    from app.screener.runner import run_screener
+    from app.services.stock_resolver import resolve_symbols
+
+    detail = ["SYM00001", "SYM00002", "SYM00003"]
+    cases = {
+        "run_screener.filtered": lambda: run_screener(FILTERS),
+        "run_screener.unfiltered": lambda: run_screener([]),
+        "run_screener.history": lambda: run_screener(FILTERS, symbols=detail),
+        "run_screener.quarters": lambda: run_screener(FILTERS, quarters=4),
+        "analytics.stats": lambda: client.get("/analytics/stats"),
+        "analytics.top_stocks": lambda: client.get("/analytics/top-stocks"),
+        "analytics.volume": lambda: client.get("/analytics/volume"),
+        "resolve_symbols": lambda: [resolve_symbols({"keywords": k}) for k in KEYWORD_SETS],
+    }
+    return {f"{name}@{size}": median_ms(fn, repeat) for name, fn in cases.items()}
+
+
+def bench_parser(repeat):
+    from app.llm.parser import parse_query
+    return {"parse_query.rules": median_ms(lambda: [parse_query(q) for q in QUERIES], repeat)}
+
+
+def run(sizes, days, malformed, repeat):
+    counters = fakes.install()
+    from app import create_app
+    client = create_app().test_client()
+
+    results = bench_parser(repeat)
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            write_csv_universe(tmp, size, days, malformed=malformed)
+            use_upload_dir(tmp)
+            print(f"universe {size} × {days} days ready in {time.perf_counter() - start:.1f}s")
+            results.update(bench_universe(client, size, repeat))
+
+    assert counters["calls"] == 0, "rule-path benchmarks reached the LLM"
+    return results
+
+
+def compare(results, baseline, tolerance, floor_ms):
+    """Print the table; returns the names that regressed."""
+    regressions = []
+    print(f"\n{'benchmark':<34} {'ms':>10} {'baseline':>10} {'change':>8}")
+    for name, ms in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<34} {ms:>10.3f} {'-':>10} {'new':>8}")
+            continue
+        change = ms / base - 1 if base else 0.0
+        flag = ""
+        if change > tolerance and ms - base > floor_ms:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<34} {ms:>10.3f} {base:>10.3f} {change:>+7.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500])
+    parser.add_argument("--days", type=int, default=250)
+    parser.add_argument("--malformed", type=float, default=0.01)
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--tolerance", type=float, default=1.0, help="allowed slowdown, 1.0 = twice the baseline")
+    parser.add_argument("--floor-ms", type=float, default=0.1, help="ignore slowdowns smaller than this")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.days, args.malformed, args.repeat)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as fh:
+            json.dump({
+                "machine": f"{platform.machine()} {platform.python_version()} ({os.cpu_count()} cpu)",
+                "config": {"days": args.days, "malformed": args.malformed, "repeat": args.repeat},
+                "results": {name: round(ms, 4) for name, ms in results.items()},
+            }, fh, indent=2)
+            fh.write("\n")
+        compare(results, {}, args.tolerance, args.floor_ms)
+        print(f"\nbaseline written to {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)["results"]
+    except FileNotFoundError:
+        print(f"no baseline at {args.baseline}; run with --update-baseline first")
+        return 2
+
+    regressions = compare(results, baseline, args.tolerance, args.floor_ms)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond +{args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    print("\nno regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Synthetic NSE-style universe for benchmarks.
+
+Frames follow the cleaned_*.csv schema and are already normalized
+(typed, date-sorted), i.e. what the screener store hands out. The CSV
+writer can also sprinkle the malformed cells real exports contain.
+"""
+import numpy as np
+import pandas as pd
+
+from app.screener.store import NUMERIC_COLS
+
+# what broken NSE / spreadsheet exports put in numeric and date cells
+BAD_NUMBERS = ["", "-", "N/A", "nan", "#VALUE!", "1,234.50", " ", "abc"]
+BAD_DATES = ["", "31-02-2020", "00-00-0000", "N/A"]
+
+
+def make_frame(symbol, days, rng, start="2015-01-01"):
+    dates = pd.bdate_range(start, periods=days)
+    close = np.round(rng.uniform(20, 3000) * np.exp(np.cumsum(rng.normal(0, 0.02, days))), 2)
+    prev_close = np.concatenate(([close[0]], close[:-1]))
+    open_ = np.round(prev_close * (1 + rng.normal(0, 0.005, days)), 2)
+    high = np.round(np.maximum(open_, close) * (1 + rng.uniform(0, 0.02, days)), 2)
+    low = np.round(np.minimum(open_, close) * (1 - rng.uniform(0, 0.02, days)), 2)
+    volume = rng.integers(1_000, 5_000_000, days)
+    vwap = np.round((high + low + close) / 3, 2)
+    deliverable = (volume * rng.uniform(0.1, 0.9, days)).astype(float)
+
+    return pd.DataFrame({
+        "date": dates,
+        "symbol": symbol,
+        "series": "EQ",
+        "prev_close": prev_close,
+        "open": open_,
+        "high": high,
+        "low": low,
+        "last": close,
+        "close": close,
+        "vwap": vwap,
+        "volume": volume,
+        "turnover": volume * vwap * 1e5,
+        "trades": rng.uniform(100, 50_000, days),
+        "deliverable_volume": deliverable,
+        "%deliverble": deliverable / volume * 100,
+    })
+
+
+def make_universe(n_symbols, days=250, seed=7):
+    """[(symbol, df, date_col)] for n_symbols synthetic tickers."""
+    rng = np.random.default_rng(seed)
+    return [
+        (f"SYM{i:05d}", make_frame(f"SYM{i:05d}", days, rng), "date")
+        for i in range(n_symbols)
+    ]
+
+
+def corrupt(df, rate, rng):
+    """
+    Replace about `rate` of the NUMERIC_COLS cells (and a tenth of that of
+    the dates) with malformed strings, in place. Rows keep their order.
+    """
+    for col in NUMERIC_COLS + ["date"]:
+        if col not in df.columns:
+            continue
+        bad = BAD_DATES if col == "date" else BAD_NUMBERS
+        hits = np.flatnonzero(rng.random(len(df)) < (rate / 10 if col == "date" else rate))
+        if len(hits):
+            df[col] = df[col].astype(object)
+            df.loc[hits, col] = rng.choice(bad, len(hits))
+    return df
+
+
+def write_csv_universe(directory, n_symbols, days=250, seed=7, malformed=0.0):
+    """
+    Write cleaned_<SYMBOL>.csv files with dayfirst date strings; returns filenames.
+    `malformed` is the fraction of numeric cells replaced by junk (see corrupt).
+    """
+    rng = np.random.default_rng(seed)
+    filenames = []
+    for i in range(n_symbols):
+        symbol = f"SYM{i:05d}"
+        df = make_frame(symbol, days, rng)
+        df["date"] = df["date"].dt.strftime("%d-%m-%Y")
+        if malformed:
+            corrupt(df, malformed, rng)
+        filename = f"cleaned_{symbol}.csv"
+        df.to_csv(f"{directory}/{filename}", index=False)
+        filenames.append(filename)
+    return filenames